@@ -50,6 +50,33 @@ if uploaded_file is not None:
                 else:
                     st.error(f"❌ API Error: {response.status_code}")
 
+        # Improve Button: streams progress as the search runs
+        if st.button("🔁 Improve Design"):
+            status = st.empty()
+            progress = st.empty()
+            response = requests.post(f"{API_URL}/improve/stream", params={"format": "jsonl"},
+                                     json=plan_data, stream=True)
+            if response.status_code != 200:
+                st.error(f"❌ API Error: {response.status_code}")
+            else:
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    event = json.loads(line)
+                    if event["event"] == "before":
+                        status.info(f"🔍 Current score: {event['before']}")
+                    elif event["event"] == "progress":
+                        status.info(f"⏳ Searching... {event['evaluations']} variants evaluated "
+                                    f"(fitness {event['fitness']['before']} → {event['fitness']['best']})")
+                        progress.json(event["areas"])
+                    elif event["event"] == "done":
+                        status.success(f"✅ Improved: {event['after']}")
+                        progress.json(event["improved_graph"])
+                        for v in event.get("violations", []):
+                            st.warning(v)
+                    elif event["event"] == "error":
+                        status.error(f"❌ {event['error']}")
+
     except json.JSONDecodeError:
         st.error("Invalid JSON format. Please upload a valid parsed floor plan.")
 else:
@@ -1,55 +1,151 @@
 # interface/api_endpoint.py
+# Keep this module's import cheap: OpenCV/OCR (floorplan_parser) and the design
+# stack load on first use, so cost lookups never pay for them on a cold start.
 
-from learner.floorplan_parser import parse_floorplan_from_prompt
-from learner.graph_builder import build_graph_from_rooms
-from training.design_improver import DesignImprover
-from utils.helpers import estimate_costs
-from knowledge.cost_library import load_costs
+from knowledge.knowledge_base import load_knowledge_base, knowledge_fingerprint
+from interface.result_cache import ResultCache, canonical_json
 import json
 
 class AURA_API:
-    def __init__(self):
-        self.improver = DesignImprover()
-        self.costs = load_costs()
+    def __init__(self, cache: ResultCache = None):
+        """
+        cache holds improve/analyze results across calls (and, on disk,
+        across processes); pass ResultCache(max_entries=0, max_disk_bytes=0) to disable.
+        """
+        self.cache = cache if cache is not None else ResultCache()
+        self._load_knowledge()
+
+    def _load_knowledge(self):
+        self._fingerprint = knowledge_fingerprint()
+        kb = load_knowledge_base()
+        self.kb_version = kb.version
+        self.costs = kb.costs
+        self._improver = None
+
+    def _check_knowledge(self):
+        """Pick up edited rule/cost files: drop the process-wide snapshots and rebuild lazily."""
+        if knowledge_fingerprint() == self._fingerprint:
+            return
+        from knowledge.room_constraints import load_room_constraints
+        load_knowledge_base.cache_clear()
+        load_room_constraints.cache_clear()
+        self._load_knowledge()
 
-    def generate_plan(self, prompt: str) -> dict:
+    @property
+    def improver(self):
+        """DesignImprover, built on first scoring/improvement request."""
+        if self._improver is None:
+            from training.design_improver import DesignImprover
+            self._improver = DesignImprover()
+        return self._improver
+
+    def _cached(self, namespace: str, payload: str, compute) -> dict:
+        self._check_knowledge()
+        return self.cache.get_or_compute(namespace, payload, self.kb_version, compute)
+
+    def improve_plan(self, raw_graph: dict, cancelled=None) -> dict:
         """
-        Generate a floor plan graph from a natural language prompt.
+        Improve an existing floor plan graph (deterministic, so results are cached by plan content).
+        If cancelled() returns True mid-search, raises SearchCancelled and caches nothing.
         """
-        rooms = parse_floorplan_from_prompt(prompt)
-        graph = build_graph_from_rooms(rooms)
-        return {
-            "status": "success",
-            "original_prompt": prompt,
-            "graph": graph.to_dict(),
-            "cost_estimate": estimate_costs(graph, self.costs),
-            "materials": graph.extract_materials()
-        }
+        return self._cached("improve", canonical_json(raw_graph), lambda: self._improve_plan(raw_graph, cancelled))
+
+    def analyze_plan(self, raw_graph: dict, cancelled=None) -> dict:
+        """
+        Score a parsed plan, list its rule violations and suggest room resizes.
+        Suggestions are computed on an overlay, so the returned graph is the plan as uploaded.
+        cancelled works as for improve_plan().
+        """
+        return self._cached("analyze", canonical_json(raw_graph), lambda: self._analyze_plan(raw_graph, cancelled))
 
-    def improve_plan(self, raw_graph: dict) -> dict:
+    def improve_plan_stream(self, raw_graph: dict, interval: float = 0.25, cancelled=None):
         """
-        Improve an existing floor plan graph.
+        improve_plan() as events: "before" (score + violations) right away,
+        "progress" with the best room areas so far every `interval` seconds,
+        then "done" carrying the same dict improve_plan() returns. Stop
+        iterating, or make cancelled() return True, to abandon the search.
         """
+        from learner.graph_builder import build_graph_from_json
+        from knowledge.room_constraints import format_violation
+
+        self._check_knowledge()
+        key = self.cache.key("improve", canonical_json(raw_graph), self.kb_version)
+        cached = self.cache.get(key, self.kb_version)
+        if cached is not None:
+            yield {"event": "before", "before": cached["before"]}
+            yield dict(cached, event="done")
+            return
+
+        graph = build_graph_from_json(raw_graph)
+        for event in self.improver.feedback_stream(graph, seed=0, interval=interval, cancelled=cancelled):
+            if event["event"] == "before":
+                event["violations"] = [format_violation(v) for v in event["violations"]]
+            elif event["event"] == "after":
+                result = self._improve_result(graph, event)
+                self.cache.put(key, self.kb_version, result)
+                event = dict(result, event="done")
+            yield event
+
+    def _improve_plan(self, raw_graph: dict, cancelled=None) -> dict:
+        from learner.graph_builder import build_graph_from_json
+
         graph = build_graph_from_json(raw_graph)
-        result = self.improver.feedback_loop(graph)
+        result = self.improver.feedback_loop(graph, verbose=False, seed=0, cancelled=cancelled)
+        return self._improve_result(graph, result)
+
+    def _improve_result(self, graph, result: dict) -> dict:
+        from knowledge.room_constraints import format_violation
+
         return {
             "status": "improved",
             "before": result['before'],
             "after": result['after'],
-            "improved_graph": result['graph'].to_dict(),
-            "cost_delta": result['after']['cost'] - result['before']['cost']
+            "improved_graph": graph.to_dict(),
+            "cost_delta": round(result['after']['material_cost'] - result['before']['material_cost'], 2),
+            "violations": [format_violation(v) for v in result['violations']]
+        }
+
+    def _analyze_plan(self, raw_graph: dict, cancelled=None) -> dict:
+        from learner.graph_builder import build_graph_from_json
+        from learner.graph_overlay import GraphOverlay
+        from knowledge.room_constraints import format_violation
+
+        graph = build_graph_from_json(raw_graph)
+        score = self.improver.score_design(graph)
+        overlay = GraphOverlay(graph)
+        resizes = self.improver.improve(overlay, seed=0, cancelled=cancelled)
+        return {
+            "status": "analyzed",
+            "graph": graph.to_dict(),
+            "score": score,
+            "violations": [format_violation(v) for v in self.improver.check_rules(graph)],
+            "suggestions": {
+                "resize": [{"room": name, "area": original, "suggested_area": new}
+                           for name, original, new in resizes],
+                "score_after": self.improver.score_design(overlay),
+            },
         }
 
     def get_cost_library(self) -> dict:
         """
         Return latest material prices.
         """
+        self._check_knowledge()
         return self.costs
 
 
 # Optional fast API interface (Future use)
 if __name__ == "__main__":
     aura = AURA_API()
-    prompt = "3-bedroom bungalow with master ensuite, open kitchen, living room, guest toilet"
-    output = aura.generate_plan(prompt)
-    print(json.dumps(output, indent=2))
+    plan = {
+        "footprint": 120.0,
+        "rooms": [
+            {"name": "Living", "type": "Living", "area": 24.0},
+            {"name": "Kitchen", "type": "Kitchen", "area": 12.0},
+            {"name": "Bedroom", "type": "Bedroom", "area": 14.0},
+            {"name": "Bathroom", "type": "Bathroom", "area": 5.0},
+        ],
+        "edges": [["Living", "Kitchen"], ["Living", "Bedroom"], ["Bedroom", "Bathroom"]],
+    }
+    output = aura.analyze_plan(plan)
+    print(json.dumps(output, indent=2, default=dict))
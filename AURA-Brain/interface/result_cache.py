@@ -0,0 +1,172 @@
+# interface/result_cache.py
+# Two-tier (in-process LRU + on-disk) cache for AURA_API results
+
+import os
+import json
+import shutil
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+
+CACHE_DIR = os.getenv("AURA_CACHE_DIR", "cache/results")
+
+# Bump when scoring, search or the shape of cached results changes in a way
+# the knowledge-base version doesn't capture (part of every key and directory)
+RESULT_VERSION = 1
+
+
+def canonical_json(value) -> str:
+    """Stable serialization of a JSON input (key order ignored, list order kept)."""
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+class ResultCache:
+    """
+    Results keyed by sha256(namespace, RESULT_VERSION, knowledge-base version,
+    canonical input).
+
+    Memory tier: LRU of serialized results, bounded by entry count.
+    Disk tier:   <cache_dir>/r<RESULT_VERSION>-<kb version>/<key[:2]>/<key>.json,
+                 bounded by total bytes; the oldest files (by mtime, refreshed
+                 on hit) go first.
+    The knowledge-base version hashes room rules, costs and affinities, so a cost
+    change yields new keys, as does a deploy that bumps RESULT_VERSION; the
+    first lookup under a new version deletes the directories of older versions.
+    Writes are atomic, so pool workers can share one cache_dir.
+    """
+
+    def __init__(self, cache_dir: str = CACHE_DIR, max_entries: int = 512,
+                 max_disk_bytes: int = 256 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        self._disk_bytes = None
+        self.hits = self.misses = 0
+
+    @staticmethod
+    def key(namespace: str, payload: str, version: str) -> str:
+        return hashlib.sha256(f"{namespace}\0{RESULT_VERSION}\0{version}\0{payload}".encode()).hexdigest()
+
+    @staticmethod
+    def _dirname(version: str) -> str:
+        return f"r{RESULT_VERSION}-{version}"
+
+    def _path(self, version: str, key: str) -> str:
+        return os.path.join(self.cache_dir, self._dirname(version), key[:2], f"{key}.json")
+
+    # --- version handling ----------------------------------------------------
+
+    def _use_version(self, version: str):
+        if version == self._version:
+            return
+        with self._lock:
+            self._memory.clear()
+            self._version = version
+            self._disk_bytes = None
+        try:
+            for entry in os.scandir(self.cache_dir):
+                if entry.is_dir() and entry.name != self._dirname(version):
+                    shutil.rmtree(entry.path, ignore_errors=True)
+        except FileNotFoundError:
+            pass
+
+    # --- lookups -------------------------------------------------------------
+
+    def get(self, key: str, version: str) -> Optional[dict]:
+        self._use_version(version)
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+        if data is None:
+            path = self._path(version, key)
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = f.read()
+                os.utime(path)
+            except OSError:
+                self.misses += 1
+                return None
+            self._remember(key, data)
+        self.hits += 1
+        return json.loads(data)
+
+    def put(self, key: str, version: str, value: dict):
+        self._use_version(version)
+        data = json.dumps(value, default=dict)
+        self._remember(key, data)
+        if self.max_disk_bytes <= 0:
+            return
+        path = self._path(version, key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.tmp{os.getpid()}.{threading.get_ident()}"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError:
+            return  # memory tier still serves this process
+        self._account(len(data.encode('utf-8')))
+
+    def get_or_compute(self, namespace: str, payload: str, version: str, compute: Callable[[], dict]) -> dict:
+        key = self.key(namespace, payload, version)
+        cached = self.get(key, version)
+        if cached is not None:
+            return cached
+        result = compute()
+        self.put(key, version, result)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._disk_bytes = None
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    # --- bounds ----------------------------------------------------------------
+
+    def _remember(self, key: str, data: str):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._memory[key] = data
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _files(self):
+        for root, _, files in os.walk(os.path.join(self.cache_dir, self._dirname(self._version))):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield stat.st_mtime, stat.st_size, path
+
+    def _account(self, size: int):
+        if self._disk_bytes is None:
+            self._disk_bytes = sum(s for _, s, _ in self._files())
+        else:
+            self._disk_bytes += size
+        if self._disk_bytes > self.max_disk_bytes:
+            self._evict()
+
+    def _evict(self):
+        """Delete oldest entries down to 80% of the budget (other processes may write concurrently)."""
+        files = sorted(self._files())
+        total = sum(size for _, size, _ in files)
+        target = self.max_disk_bytes * 0.8
+        for _, size, path in files:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._disk_bytes = total
@@ -0,0 +1,215 @@
+# interface/server.py
+# HTTP front end for AURA_API: POST /analyze, /improve, /improve/stream and GET /costs
+#
+# Request threads only parse and validate JSON and wait on futures; scoring and
+# improvement run in a process pool with one AURA_API per worker, so a slow plan
+# never holds the GIL for other users. Admission is capped (503 when full) and
+# every pooled call has a deadline (504 when exceeded), after which the worker's
+# search is cancelled.
+#
+#   python -m interface.server --workers 4                          (development)
+#   gunicorn -w 1 -k gthread --threads 32 "interface.server:create_app()"   (production)
+
+import os
+import json
+import time
+import queue
+import argparse
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+
+from flask import Flask, Response, request, stream_with_context
+
+from interface.api_endpoint import AURA_API
+from learner.graph_builder import build_graph_from_json
+
+WORKERS = int(os.getenv("AURA_WORKERS", os.cpu_count() or 1))
+MAX_PENDING = int(os.getenv("AURA_MAX_PENDING", WORKERS * 8))
+REQUEST_TIMEOUT_S = float(os.getenv("AURA_TIMEOUT_S", 30))
+STREAM_INTERVAL_S = 0.25
+MAX_BODY_BYTES = 8 * 1024 * 1024
+
+# One AURA_API per pool process, created by _init_worker
+_worker_api = None
+
+
+def _init_worker():
+    global _worker_api
+    _worker_api = AURA_API()
+
+
+def _call(method: str, payload, cancel):
+    return getattr(_worker_api, method)(payload, cancelled=cancel.is_set)
+
+
+def _stream_call(method: str, payload, events, cancel):
+    """Run a streaming AURA_API method in a worker, forwarding events until done or cancelled."""
+    try:
+        for event in getattr(_worker_api, method)(payload, interval=STREAM_INTERVAL_S, cancelled=cancel.is_set):
+            if cancel.is_set():
+                break
+            events.put(event)
+    except Exception as e:  # plans are validated up front, so this is a server-side failure
+        events.put({"event": "error", "error": f"Internal error: {type(e).__name__}"})
+    finally:
+        events.put(None)
+
+
+def _json(body, status: int = 200) -> Response:
+    return Response(json.dumps(body, default=dict), status=status, mimetype="application/json")
+
+
+def _error(message: str, status: int) -> Response:
+    return _json({"status": "error", "error": message}, status)
+
+
+class WorkerPool:
+    """
+    Process pool plus an admission limit. submit() refuses work instead of
+    queueing without bound, so overload shows up as fast 503s, not as every
+    request timing out together.
+    """
+
+    def __init__(self, workers: int = WORKERS, max_pending: int = MAX_PENDING,
+                 timeout: float = REQUEST_TIMEOUT_S):
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+        # Cancel events and stream queues for workers; every pooled call uses one
+        self._manager = multiprocessing.Manager()
+
+    def _admit(self):
+        if self._slots.acquire(blocking=False):
+            return None
+        response = _error("Server busy, retry shortly", 503)
+        response.headers["Retry-After"] = "1"
+        return response
+
+    def run(self, method: str, payload) -> Response:
+        """
+        Call a cancellable AURA_API method in the pool. Plans are validated
+        before they get here, so any exception from the worker is a 500. On
+        timeout the cancel event stops the worker's search at its next generation.
+        """
+        refused = self._admit()
+        if refused is not None:
+            return refused
+        cancel = self._manager.Event()
+        future = self._pool.submit(_call, method, payload, cancel)
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return _json(future.result(timeout=self.timeout))
+        except FutureTimeout:
+            cancel.set()
+            return _error(f"Timed out after {self.timeout:g}s", 504)
+        except ImportError as e:
+            return _error(f"Not available on this server: {e}", 501)
+        except Exception as e:
+            return _error(f"Internal error: {type(e).__name__}", 500)
+
+    def stream(self, method: str, payload, jsonl: bool = False) -> Response:
+        """
+        Relay a streaming method's events as server-sent events (or JSON lines).
+        Events cross from the worker through a manager queue; when the client
+        disconnects or the deadline passes, the cancel event stops the worker's search.
+        """
+        refused = self._admit()
+        if refused is not None:
+            return refused
+        events, cancel = self._manager.Queue(), self._manager.Event()
+        future = self._pool.submit(_stream_call, method, payload, events, cancel)
+        future.add_done_callback(lambda _: self._slots.release())
+        deadline = time.monotonic() + self.timeout
+
+        def generate():
+            try:
+                while True:
+                    try:
+                        event = events.get(timeout=max(0.0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        event = {"event": "error", "error": f"Timed out after {self.timeout:g}s"}
+                    if event is None:
+                        return
+                    body = json.dumps(event, default=dict)
+                    yield f"{body}\n" if jsonl else f"event: {event['event']}\ndata: {body}\n\n"
+                    if event["event"] == "error":
+                        return
+            finally:
+                cancel.set()  # no-op if the worker already finished
+
+        mimetype = "application/x-ndjson" if jsonl else "text/event-stream"
+        return Response(stream_with_context(generate()), mimetype=mimetype,
+                        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._manager.shutdown()
+
+
+def _plan_body():
+    """(plan, None) for a request body that builds into a RoomGraph, else (None, 400 response)."""
+    plan = request.get_json(silent=True)
+    if not isinstance(plan, dict) or not isinstance(plan.get("rooms"), list):
+        return None, _error("Expected a JSON plan with a 'rooms' list", 400)
+    try:
+        build_graph_from_json(plan)
+    except (KeyError, ValueError, TypeError, AttributeError) as e:
+        return None, _error(f"Invalid plan: {e}", 400)
+    return plan, None
+
+
+def create_app(pool: WorkerPool = None) -> Flask:
+    app = Flask("aura")
+    app.config["MAX_CONTENT_LENGTH"] = MAX_BODY_BYTES
+    pool = pool or WorkerPool()
+    app.extensions["aura_pool"] = pool
+    # Cost lookups are dictionary reads; serve them in-process, serialized once per knowledge version
+    api = AURA_API()
+    serialized_costs = {}
+
+    @app.post("/analyze")
+    def analyze():
+        plan, invalid = _plan_body()
+        return invalid or pool.run("analyze_plan", plan)
+
+    @app.post("/improve")
+    def improve():
+        plan, invalid = _plan_body()
+        return invalid or pool.run("improve_plan", plan)
+
+    @app.post("/improve/stream")
+    def improve_stream():
+        plan, invalid = _plan_body()
+        return invalid or pool.stream("improve_plan_stream", plan, jsonl=request.args.get("format") == "jsonl")
+
+    @app.get("/costs")
+    def cost_library():
+        costs = api.get_cost_library()
+        if api.kb_version not in serialized_costs:
+            serialized_costs.clear()
+            serialized_costs[api.kb_version] = json.dumps(costs, default=dict)
+        return Response(serialized_costs[api.kb_version], mimetype="application/json")
+
+    @app.get("/health")
+    def health():
+        return _json({"status": "ok"})
+
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve AURA_API over HTTP.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=WORKERS, help="scoring process pool size")
+    parser.add_argument("--max-pending", type=int, default=None, help="requests admitted at once (default workers*8)")
+    parser.add_argument("--timeout", type=float, default=REQUEST_TIMEOUT_S, help="seconds per request")
+    args = parser.parse_args()
+
+    pool = WorkerPool(args.workers, args.max_pending or args.workers * 8, args.timeout)
+    print(f"🚀 AURA API on http://{args.host}:{args.port} ({args.workers} workers)")
+    try:
+        create_app(pool).run(host=args.host, port=args.port, threaded=True)
+    finally:
+        pool.shutdown()
@@ -0,0 +1,70 @@
+# interface/startup_benchmark.py
+# Cold-start import cost of each entry point, measured in fresh interpreters
+
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+ENTRY_POINTS = [
+    "interface.api_endpoint",
+    "training.feedback_loop",
+    "training.design_improver",
+    "knowledge.cost_library",
+    "knowledge.room_constraints",
+    "learner.plan_corpus",
+    "learner.floorplan_parser",
+]
+
+# Modules that should only load on the code paths that need them
+HEAVY_MODULES = ["cv2", "pytesseract", "sklearn", "networkx", "yaml"]
+
+_PROBE = """
+import sys, json, time, importlib
+start = time.perf_counter()
+try:
+    importlib.import_module({module!r})
+    error = None
+except Exception as exc:
+    error = f"{{type(exc).__name__}}: {{exc}}"
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({{"ms": elapsed, "error": error,
+                  "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(module: str, repeat: int = 5) -> dict:
+    """Import module in `repeat` fresh interpreters; report median/min wall time and heavy deps pulled in."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [root, os.environ.get("PYTHONPATH")])))
+    samples, last = [], {}
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+                             cwd=root, env=env, capture_output=True, text=True, check=True)
+        last = json.loads(out.stdout.strip().splitlines()[-1])
+        samples.append(last["ms"])
+    return {
+        "module": module,
+        "median_ms": round(statistics.median(samples), 1),
+        "min_ms": round(min(samples), 1),
+        "heavy": last["heavy"],
+        "error": last["error"],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure cold-start import time of AURA entry points.")
+    parser.add_argument("modules", nargs="*", default=ENTRY_POINTS)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    results = [measure(module, args.repeat) for module in args.modules]
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for r in results:
+            status = f"❌ {r['error']}" if r["error"] else ", ".join(r["heavy"]) or "-"
+            print(f"⏱️  {r['module']:<30} {r['median_ms']:>8.1f} ms (min {r['min_ms']:.1f})  heavy: {status}")
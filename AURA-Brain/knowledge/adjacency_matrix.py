@@ -0,0 +1,80 @@
+# knowledge/adjacency_matrix.py
+
+import json
+from functools import lru_cache
+from typing import Iterable
+import numpy as np
+
+ADJACENCY_PATH = "knowledge/adjacency_matrix.json"
+
+
+class AdjacencyMatrix:
+    """
+    Pairwise room-type affinities from adjacency_matrix.json compiled into a
+    dense float32 matrix. The JSON lists most pairs from one side only, so the
+    matrix is symmetrised with the larger of the two directions. An extra
+    last row/column holds 0.0 for room types the file does not know.
+    """
+
+    def __init__(self, affinities: dict):
+        self.types = sorted(set(affinities) | {t for row in affinities.values() for t in row})
+        self.type_index = {rtype: i for i, rtype in enumerate(self.types)}
+        self.unknown = len(self.types)
+
+        matrix = np.zeros((self.unknown + 1, self.unknown + 1), dtype=np.float32)
+        for src, row in affinities.items():
+            for dst, value in row.items():
+                matrix[self.type_index[src], self.type_index[dst]] = value
+        self.matrix = np.maximum(matrix, matrix.T)
+
+    @classmethod
+    def from_compiled(cls, types, matrix: np.ndarray) -> "AdjacencyMatrix":
+        """Rebuild from a previously compiled type list and (possibly memory-mapped) matrix."""
+        self = cls.__new__(cls)
+        self.types = list(types)
+        self.type_index = {rtype: i for i, rtype in enumerate(self.types)}
+        self.unknown = len(self.types)
+        self.matrix = matrix
+        return self
+
+    @classmethod
+    def from_file(cls, path: str = ADJACENCY_PATH) -> "AdjacencyMatrix":
+        with open(path, 'r') as f:
+            return cls(json.load(f))
+
+    def type_ids(self, room_types: Iterable[str]) -> np.ndarray:
+        """Row index per room type (unknown types map to the all-zero row)."""
+        return np.fromiter((self.type_index.get(t, self.unknown) for t in room_types), dtype=np.intp)
+
+    def score_ids(self, src_ids: np.ndarray, dst_ids: np.ndarray) -> float:
+        """Adjacency quality 0-100: mean affinity over the plan's edges."""
+        if len(src_ids) == 0:
+            return 0.0
+        return round(float(self.matrix[src_ids, dst_ids].mean()) * 100, 2)
+
+    def score_batch(self, src_ids: np.ndarray, dst_ids: np.ndarray, edge_offsets: np.ndarray) -> np.ndarray:
+        """
+        Score many plans at once. Edges of plan p are src_ids/dst_ids[edge_offsets[p]:edge_offsets[p + 1]].
+        """
+        affinity = self.matrix[src_ids, dst_ids].astype(np.float64)
+        counts = np.diff(edge_offsets)
+        totals = np.zeros(len(counts))
+        nonempty = counts > 0
+        if nonempty.any():
+            totals[nonempty] = np.add.reduceat(affinity, edge_offsets[:-1][nonempty])
+        scores = np.zeros(len(counts))
+        np.divide(totals, counts, out=scores, where=nonempty)
+        return np.round(scores * 100, 2)
+
+    def score_graph(self, graph) -> float:
+        """Convenience path for a single graph with a 'type' on each room."""
+        types = {node: room.get("type", "") for node, room in graph.nodes(data=True)}
+        edges = list(graph.edges())
+        return self.score_ids(self.type_ids(types[u] for u, _ in edges),
+                              self.type_ids(types[v] for _, v in edges))
+
+
+@lru_cache(maxsize=None)
+def load_adjacency(path: str = ADJACENCY_PATH) -> AdjacencyMatrix:
+    """Parse and compile the affinity file once per process."""
+    return AdjacencyMatrix.from_file(path)
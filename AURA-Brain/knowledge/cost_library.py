@@ -0,0 +1,28 @@
+# knowledge/cost_library.py
+# Cost lookups backed by the shared knowledge-base snapshot
+
+from typing import Dict, Mapping
+
+from knowledge.knowledge_base import KNOWLEDGE_DIR, load_knowledge_base
+
+# Short material names used by the scoring heuristics -> cost_library.json entries
+MATERIAL_ALIASES = {
+    "cement": "concrete",
+    "tile": "ceramic_tile",
+    "wood": "laminate_wood",
+}
+
+
+def load_costs(knowledge_dir: str = KNOWLEDGE_DIR) -> Mapping:
+    """Full cost library (read-only), as in cost_library.json."""
+    return load_knowledge_base(knowledge_dir).costs
+
+
+def get_material_costs(knowledge_dir: str = KNOWLEDGE_DIR) -> Dict[str, float]:
+    """Base USD cost per unit for every material, plus the short aliases."""
+    materials = load_costs(knowledge_dir)["materials"]
+    costs = {name: entry["base_cost_usd"] for name, entry in materials.items()}
+    for alias, name in MATERIAL_ALIASES.items():
+        if name in costs:
+            costs[alias] = costs[name]
+    return costs
@@ -0,0 +1,208 @@
+# knowledge/knowledge_base.py
+# One compiled, immutable snapshot of room_rules.yaml, cost_library.json and adjacency_matrix.json
+
+import os
+import json
+import hashlib
+from functools import lru_cache
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Callable, Mapping, Union
+
+if TYPE_CHECKING:
+    from knowledge.adjacency_matrix import AdjacencyMatrix
+
+KNOWLEDGE_DIR = "knowledge"
+RULES_FILE = "room_rules.yaml"
+COSTS_FILE = "cost_library.json"
+ADJACENCY_FILE = "adjacency_matrix.json"
+CACHE_DIRNAME = ".cache"
+
+
+def _freeze(value):
+    """Recursively turn dicts into read-only mappings and lists into tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+class KnowledgeBase:
+    """
+    Read-only view of the knowledge files.
+
+    rules / costs are frozen mappings; adjacency is the compiled affinity
+    matrix (memory-mapped from the on-disk snapshot when loaded from cache,
+    so forked or spawned workers share its pages). version is a hash of the
+    three source files' contents, for keying caches of derived results.
+
+    adjacency may be given as a zero-argument loader; it then runs on first
+    access, so cost lookups never import NumPy or map the matrix.
+    """
+    __slots__ = ("rules", "costs", "_adjacency", "version")
+
+    def __init__(self, rules: Mapping, costs: Mapping,
+                 adjacency: Union["AdjacencyMatrix", Callable[[], "AdjacencyMatrix"]], version: str):
+        object.__setattr__(self, "rules", _freeze(rules))
+        object.__setattr__(self, "costs", _freeze(costs))
+        object.__setattr__(self, "_adjacency", adjacency)
+        object.__setattr__(self, "version", version)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("KnowledgeBase is read-only")
+
+    @property
+    def adjacency(self) -> "AdjacencyMatrix":
+        if callable(self._adjacency):
+            object.__setattr__(self, "_adjacency", self._adjacency())
+        return self._adjacency
+
+    def room_definition(self, room_type: str) -> Mapping:
+        return self.rules.get("room_definitions", {}).get(room_type, MappingProxyType({}))
+
+
+def _source_paths(knowledge_dir: str):
+    return [os.path.join(knowledge_dir, name) for name in (RULES_FILE, COSTS_FILE, ADJACENCY_FILE)]
+
+
+def _fingerprint(paths) -> str:
+    """Cheap cache key from file mtimes and sizes; no file contents are read."""
+    h = hashlib.sha256()
+    for path in paths:
+        stat = os.stat(path)
+        h.update(f"{path}:{stat.st_mtime_ns}:{stat.st_size};".encode())
+    return h.hexdigest()[:16]
+
+
+def knowledge_fingerprint(knowledge_dir: str = KNOWLEDGE_DIR) -> str:
+    """Changes whenever any knowledge file is edited; cheap enough to check per request."""
+    return _fingerprint(_source_paths(knowledge_dir))
+
+
+def compile_knowledge_base(knowledge_dir: str = KNOWLEDGE_DIR) -> KnowledgeBase:
+    """Parse and validate the three knowledge files (slow path: YAML + JSON parsing)."""
+    import yaml
+    from knowledge.adjacency_matrix import AdjacencyMatrix
+
+    rules_path, costs_path, adjacency_path = _source_paths(knowledge_dir)
+    contents = hashlib.sha256()
+    with open(rules_path, 'rb') as f:
+        raw = f.read()
+        contents.update(raw)
+        rules = yaml.safe_load(raw) or {}
+    with open(costs_path, 'rb') as f:
+        raw = f.read()
+        contents.update(raw)
+        costs = json.loads(raw)
+    with open(adjacency_path, 'rb') as f:
+        raw = f.read()
+        contents.update(raw)
+        adjacency = AdjacencyMatrix(json.loads(raw))
+
+    if not isinstance(rules.get("room_definitions", {}), dict):
+        raise ValueError(f"{rules_path}: room_definitions must be a mapping")
+    for room_type, definition in rules.get("room_definitions", {}).items():
+        lo, hi = definition.get("min_area_m2"), definition.get("max_area_m2")
+        if lo is not None and hi is not None and lo > hi:
+            raise ValueError(f"{rules_path}: {room_type} min_area_m2 > max_area_m2")
+    if not isinstance(costs.get("materials"), dict):
+        raise ValueError(f"{costs_path}: missing 'materials' section")
+
+    return KnowledgeBase(rules, costs, adjacency, contents.hexdigest()[:16])
+
+
+def _write_snapshot(kb: KnowledgeBase, cache_dir: str, key: str):
+    """
+    Both files are written to temporaries and renamed into place, so another
+    process mapping the .npy never sees a partial array. The JSON payload goes
+    last and marks the snapshot complete. JSON rather than pickle, so a
+    tampered cache directory can't run code on load. Snapshots of older
+    source versions are then deleted (processes that already mapped an old
+    array keep their pages; one that hasn't yet recompiles from source).
+    """
+    import numpy as np
+
+    os.makedirs(cache_dir, exist_ok=True)
+    matrix_path = os.path.join(cache_dir, f"kb-{key}.adjacency.npy")
+    tmp = f"{matrix_path}.tmp{os.getpid()}"
+    with open(tmp, 'wb') as f:
+        np.save(f, kb.adjacency.matrix, allow_pickle=False)
+    os.replace(tmp, matrix_path)
+    payload = {
+        "rules": _thaw(kb.rules),
+        "costs": _thaw(kb.costs),
+        "types": kb.adjacency.types,
+        "version": kb.version,
+    }
+    payload_path = os.path.join(cache_dir, f"kb-{key}.json")
+    tmp = f"{payload_path}.tmp{os.getpid()}"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(payload, f)
+    os.replace(tmp, payload_path)
+
+    for entry in os.scandir(cache_dir):
+        if entry.name.startswith("kb-") and not entry.name.startswith(f"kb-{key}."):
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass  # another process cleaned up first
+
+
+def _read_snapshot(knowledge_dir: str, cache_dir: str, key: str) -> KnowledgeBase:
+    with open(os.path.join(cache_dir, f"kb-{key}.json"), 'r', encoding='utf-8') as f:
+        payload = json.load(f)
+    matrix_path = os.path.join(cache_dir, f"kb-{key}.adjacency.npy")
+    if not os.path.exists(matrix_path):
+        raise FileNotFoundError(matrix_path)
+
+    def adjacency():
+        import numpy as np
+        from knowledge.adjacency_matrix import AdjacencyMatrix
+        try:
+            matrix = np.load(matrix_path, mmap_mode='r')
+        except (OSError, ValueError):
+            # Array replaced or damaged after the snapshot was read: rebuild from source
+            return compile_knowledge_base(knowledge_dir).adjacency
+        return AdjacencyMatrix.from_compiled(payload["types"], matrix)
+
+    return KnowledgeBase(payload["rules"], payload["costs"], adjacency, payload["version"])
+
+
+def _thaw(value):
+    if isinstance(value, Mapping):
+        return {k: _thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(v) for v in value]
+    return value
+
+
+@lru_cache(maxsize=None)
+def load_knowledge_base(knowledge_dir: str = KNOWLEDGE_DIR) -> KnowledgeBase:
+    """
+    Process-wide snapshot of the knowledge files.
+    The compiled form is cached under <knowledge_dir>/.cache keyed by the source
+    files' mtimes and sizes, so a cold start reads one JSON file and maps one array
+    instead of parsing YAML. Editing any source file produces a new key.
+    """
+    key = knowledge_fingerprint(knowledge_dir)
+    cache_dir = os.path.join(knowledge_dir, CACHE_DIRNAME)
+    try:
+        return _read_snapshot(knowledge_dir, cache_dir, key)
+    except (OSError, ValueError, KeyError):
+        pass  # missing, partial or foreign snapshot: recompile
+    kb = compile_knowledge_base(knowledge_dir)
+    try:
+        _write_snapshot(kb, cache_dir, key)
+    except (OSError, TypeError, ValueError):
+        pass  # read-only deployments, or rules JSON can't represent, skip the disk cache
+    return kb
+
+
+if __name__ == "__main__":
+    import time
+
+    start = time.perf_counter()
+    kb = load_knowledge_base()
+    print(f"📚 Knowledge base {kb.version} loaded in {(time.perf_counter() - start) * 1000:.1f} ms")
+    print(f"Room types: {len(kb.rules.get('room_definitions', {}))} | "
+          f"Materials: {len(kb.costs['materials'])} | Affinity types: {len(kb.adjacency.types)}")
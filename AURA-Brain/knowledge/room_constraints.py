@@ -0,0 +1,231 @@
+# knowledge/room_constraints.py
+# Checks plans against room_rules.yaml room_definitions using per-type arrays and adjacency bitmasks
+
+from functools import lru_cache
+from typing import Dict, List, Mapping, Optional
+import numpy as np
+
+from knowledge.knowledge_base import KNOWLEDGE_DIR, load_knowledge_base
+
+# Violation kinds, in the order they are reported per room
+MIN_AREA = "min_area"
+MAX_AREA = "max_area"
+MISSING_CONNECTION = "must_connect_to"
+NO_ACCESS = "access_from"
+NEXT_TO_AVOIDED = "avoid_next_to"
+NO_DAYLIGHT = "natural_light_required"
+
+
+class RoomConstraints:
+    """
+    room_definitions compiled for vectorized checking. Every room type that
+    appears anywhere in the rules gets a bit; per type we keep:
+      min_area / max_area         float arrays (nan = no bound)
+      must_connect / access_from / avoid   uint64 bitmasks over types
+      needs_light                 bool array
+    A room's neighbour-type mask is the OR of its neighbours' bits, so each rule
+    is one AND per room (or per edge for avoid_next_to).
+    """
+
+    def __init__(self, rules: Mapping):
+        definitions = rules.get("room_definitions", {})
+        referenced = set(definitions)
+        for definition in definitions.values():
+            for key in ("must_connect_to", "access_from", "avoid_next_to"):
+                referenced.update(definition.get(key, ()))
+        self.types = sorted(referenced)
+        if len(self.types) > 64:
+            raise ValueError("room_constraints supports at most 64 room types")
+        self.type_index = {rtype: i for i, rtype in enumerate(self.types)}
+        # Unknown room types use the extra last row: no bounds, no rules
+        self.unknown = len(self.types)
+
+        n = self.unknown + 1
+        self.min_area = np.full(n, np.nan)
+        self.max_area = np.full(n, np.nan)
+        self.must_connect = np.zeros(n, dtype=np.uint64)
+        self.access_from = np.zeros(n, dtype=np.uint64)
+        self.avoid = np.zeros(n, dtype=np.uint64)
+        self.needs_light = np.zeros(n, dtype=bool)
+        self.bits = np.array([1 << i for i in range(self.unknown)] + [0], dtype=np.uint64)
+
+        for rtype, definition in definitions.items():
+            i = self.type_index[rtype]
+            self.min_area[i] = definition.get("min_area_m2", np.nan)
+            self.max_area[i] = definition.get("max_area_m2", np.nan)
+            self.must_connect[i] = self._mask(definition.get("must_connect_to", ()))
+            self.access_from[i] = self._mask(definition.get("access_from", ()))
+            self.avoid[i] = self._mask(definition.get("avoid_next_to", ()))
+            self.needs_light[i] = bool(definition.get("natural_light_required", False))
+
+    def _mask(self, types) -> int:
+        mask = 0
+        for rtype in types:
+            mask |= 1 << self.type_index[rtype]
+        return mask
+
+    def type_names(self, mask: int) -> List[str]:
+        return [rtype for i, rtype in enumerate(self.types) if mask >> i & 1]
+
+    def type_ids(self, room_types) -> np.ndarray:
+        return np.fromiter((self.type_index.get(t, self.unknown) for t in room_types), dtype=np.intp)
+
+    # --- vectorized core ---------------------------------------------------
+
+    def check_arrays(self, type_ids: np.ndarray, areas: np.ndarray, edge_src: np.ndarray,
+                     edge_dst: np.ndarray, has_light: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+        """
+        Check flat room/edge arrays (edges index into the room arrays; many plans
+        can be stacked as long as edge indices are global). has_light holds
+        1 / 0 / -1 (unknown) per room; unknown rooms are not flagged.
+        Returns per-room boolean masks per rule, per-edge mask for avoid_next_to,
+        and the neighbour-type masks used for reporting.
+        """
+        nbr = np.zeros(len(type_ids), dtype=np.uint64)
+        np.bitwise_or.at(nbr, edge_src, self.bits[type_ids[edge_dst]])
+        np.bitwise_or.at(nbr, edge_dst, self.bits[type_ids[edge_src]])
+
+        with np.errstate(invalid="ignore"):
+            too_small = areas < self.min_area[type_ids]
+            too_large = areas > self.max_area[type_ids]
+        must = self.must_connect[type_ids]
+        access = self.access_from[type_ids]
+        src_bits, dst_bits = self.bits[type_ids[edge_src]], self.bits[type_ids[edge_dst]]
+        avoided = ((self.avoid[type_ids[edge_src]] & dst_bits) != 0) | ((self.avoid[type_ids[edge_dst]] & src_bits) != 0)
+        if has_light is None:
+            dark = np.zeros(len(type_ids), dtype=bool)
+        else:
+            dark = self.needs_light[type_ids] & (has_light == 0)
+
+        return {
+            MIN_AREA: too_small,
+            MAX_AREA: too_large,
+            MISSING_CONNECTION: (must & ~nbr) != 0,
+            NO_ACCESS: (access != 0) & ((access & nbr) == 0),
+            NEXT_TO_AVOIDED: avoided,
+            NO_DAYLIGHT: dark,
+            "neighbour_mask": nbr,
+        }
+
+    # --- graphs ------------------------------------------------------------
+
+    @staticmethod
+    def _light_flag(room) -> int:
+        light = room.get("natural_light", room.get("windows"))
+        if light is None:
+            return -1
+        return 1 if light else 0
+
+    def _graph_arrays(self, graph, offset: int = 0):
+        nodes = list(graph.nodes(data=True))
+        index = {node: i for i, (node, _) in enumerate(nodes)}
+        edges = list(graph.edges())
+        return (
+            [node for node, _ in nodes],
+            self.type_ids(room.get("type", "") for _, room in nodes),
+            np.array([room.get("area", 0) for _, room in nodes], dtype=float),
+            np.array([offset + index[u] for u, _ in edges], dtype=np.intp),
+            np.array([offset + index[v] for _, v in edges], dtype=np.intp),
+            np.array([self._light_flag(room) for _, room in nodes], dtype=np.int8),
+            [(u, v) for u, v in edges],
+        )
+
+    def check(self, graph) -> List[dict]:
+        """Structured violations for one plan."""
+        nodes, type_ids, areas, src, dst, light, edges = self._graph_arrays(graph)
+        masks = self.check_arrays(type_ids, areas, src, dst, light)
+        return self._report(nodes, type_ids, areas, edges, masks, range(len(nodes)), range(len(edges)))
+
+    def check_batch(self, graphs) -> List[List[dict]]:
+        """Check many plans in one vectorized pass; violations are grouped per plan."""
+        parts, offset = [], 0
+        for graph in graphs:
+            parts.append(self._graph_arrays(graph, offset))
+            offset += len(parts[-1][0])
+        if not parts:
+            return []
+        masks = self.check_arrays(
+            np.concatenate([p[1] for p in parts]),
+            np.concatenate([p[2] for p in parts]),
+            np.concatenate([p[3] for p in parts]),
+            np.concatenate([p[4] for p in parts]),
+            np.concatenate([p[5] for p in parts]),
+        )
+        results, room_start, edge_start = [], 0, 0
+        for nodes, type_ids, areas, src, _, _, edges in parts:
+            rooms = range(room_start, room_start + len(nodes))
+            doors = range(edge_start, edge_start + len(edges))
+            results.append(self._report(nodes, type_ids, areas, edges, masks, rooms, doors,
+                                        room_start, edge_start))
+            room_start += len(nodes)
+            edge_start += len(edges)
+        return results
+
+    def count_violations(self, masks: Dict[str, np.ndarray], room_plan: np.ndarray,
+                         edge_plan: np.ndarray, n_plans: int) -> np.ndarray:
+        """Violations per plan from check_arrays masks (for corpus-scale scoring)."""
+        room_flags = sum(masks[k].astype(np.int64) for k in (MIN_AREA, MAX_AREA, MISSING_CONNECTION, NO_ACCESS, NO_DAYLIGHT))
+        return (np.bincount(room_plan, weights=room_flags, minlength=n_plans)
+                + np.bincount(edge_plan, weights=masks[NEXT_TO_AVOIDED], minlength=n_plans)).astype(np.int64)
+
+    def check_corpus(self, corpus) -> np.ndarray:
+        """Violation count per plan of a PlanCorpus, straight from its mapped columns."""
+        room_plan = np.repeat(np.arange(len(corpus)), np.diff(corpus.room_offsets))
+        edge_plan = np.repeat(np.arange(len(corpus)), np.diff(corpus.edge_offsets))
+        base = corpus.room_offsets[:-1][edge_plan]
+        type_ids = self.type_ids(corpus.types)[corpus.room_type]
+        masks = self.check_arrays(type_ids, np.asarray(corpus.room_area),
+                                  base + corpus.edge_src, base + corpus.edge_dst, corpus.light_flags())
+        return self.count_violations(masks, room_plan, edge_plan, len(corpus))
+
+    def _report(self, nodes, type_ids, areas, edges, masks, rooms, doors,
+                room_start: int = 0, edge_start: int = 0) -> List[dict]:
+        violations = []
+        for g in rooms:
+            i = g - room_start
+            t = type_ids[i]
+            rtype = self.types[t] if t < self.unknown else None
+            if masks[MIN_AREA][g]:
+                violations.append({"room": nodes[i], "type": rtype, "rule": MIN_AREA,
+                                   "detail": f"{areas[i]:.1f} m² < {self.min_area[t]:g} m²"})
+            if masks[MAX_AREA][g]:
+                violations.append({"room": nodes[i], "type": rtype, "rule": MAX_AREA,
+                                   "detail": f"{areas[i]:.1f} m² > {self.max_area[t]:g} m²"})
+            if masks[MISSING_CONNECTION][g]:
+                missing = int(self.must_connect[t]) & ~int(masks["neighbour_mask"][g])
+                violations.append({"room": nodes[i], "type": rtype, "rule": MISSING_CONNECTION,
+                                   "detail": ", ".join(self.type_names(missing))})
+            if masks[NO_ACCESS][g]:
+                violations.append({"room": nodes[i], "type": rtype, "rule": NO_ACCESS,
+                                   "detail": ", ".join(self.type_names(int(self.access_from[t])))})
+            if masks[NO_DAYLIGHT][g]:
+                violations.append({"room": nodes[i], "type": rtype, "rule": NO_DAYLIGHT, "detail": ""})
+        for e in doors:
+            if masks[NEXT_TO_AVOIDED][e]:
+                u, v = edges[e - edge_start]
+                t = type_ids[nodes.index(u)]
+                violations.append({"room": u, "type": self.types[t] if t < self.unknown else None,
+                                   "rule": NEXT_TO_AVOIDED, "detail": str(v)})
+        return violations
+
+
+def format_violation(violation: dict) -> str:
+    """One-line message for UIs and logs."""
+    room, rule, detail = violation["room"], violation["rule"], violation["detail"]
+    if rule == MIN_AREA:
+        return f"{room} is too small: {detail}"
+    if rule == MAX_AREA:
+        return f"{room} is too large: {detail}"
+    if rule == MISSING_CONNECTION:
+        return f"{room} must connect to: {detail}"
+    if rule == NO_ACCESS:
+        return f"{room} needs access from one of: {detail}"
+    if rule == NEXT_TO_AVOIDED:
+        return f"{room} should not be next to {detail}"
+    return f"{room} requires natural light"
+
+
+@lru_cache(maxsize=None)
+def load_room_constraints(knowledge_dir: str = KNOWLEDGE_DIR) -> RoomConstraints:
+    """Constraints compiled once per process from the knowledge-base snapshot."""
+    return RoomConstraints(load_knowledge_base(knowledge_dir).rules)
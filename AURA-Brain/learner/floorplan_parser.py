@@ -3,10 +3,13 @@
 
 import cv2
 import os
+import json
+import hashlib
 import numpy as np
 import pytesseract
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from pathlib import Path
-from typing import List, Dict, Tuple
+from typing import Dict, Iterable, Iterator, List, Tuple, Union
 
 # Architecture-aware room labels
 KNOWN_ROOMS = [
@@ -14,39 +17,172 @@ KNOWN_ROOMS = [
     "Dining", "Garage", "Balcony", "Store", "Office", "Pantry", "Closet"
 ]
 
-def preprocess_image(image_path: str) -> np.ndarray:
-    """Load and clean image for OCR and structure detection."""
-    img = cv2.imread(image_path)
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff")
+
+# Edge and wall detection parameters (part of the parse cache key)
+CANNY_PARAMS = {"threshold1": 50, "threshold2": 150, "apertureSize": 3}
+HOUGH_PARAMS = {"rho": 1, "theta": np.pi / 180, "threshold": 100, "minLineLength": 40, "maxLineGap": 10}
+
+# Bump when parsing logic changes in a way the parameters above don't capture
+PARSER_VERSION = 3
+PARSE_CACHE_DIR = os.getenv("AURA_PARSE_CACHE", "data/parse_cache")
+
+# Region-of-interest OCR: candidate labels are found on a downscaled copy
+ROI_MAX_SIDE = 1200          # pyramid level used for text-region search
+ROI_MIN_GLYPH_PX = 3         # glyph height bounds at that level
+ROI_MAX_GLYPH_PX = 40
+ROI_MAX_REGIONS = 400        # beyond this, one full-page pass is cheaper
+ROI_PAD = 0.35               # crop margin, as a fraction of region height
+ROI_GAP_PX = 12              # spacing between crops in the OCR mosaic
+
+def _load(image_path: str, raw: bytes = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Decode once; returns (BGR image, grayscale, Canny edges) so later stages reuse the buffers.
+    raw is the file's bytes when the caller has already read them (e.g. to hash).
+    """
+    if raw is None:
+        img = cv2.imread(image_path)
+    else:
+        img = cv2.imdecode(np.frombuffer(raw, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if img is None:
+        raise ValueError(f"Could not decode image: {image_path}")
     gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
     blur = cv2.GaussianBlur(gray, (3, 3), 0)
-    edges = cv2.Canny(blur, 50, 150, apertureSize=3)
+    edges = cv2.Canny(blur, **CANNY_PARAMS)
+    return img, gray, edges
+
+def preprocess_image(image_path: str) -> np.ndarray:
+    """Load and clean image for OCR and structure detection."""
+    img, _, edges = _load(image_path)
     return img, edges
 
-def extract_rooms(img: np.ndarray) -> List[Dict]:
-    """Use OCR to detect known room names and locations."""
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-    thresh = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_MEAN_C,
-                                   cv2.THRESH_BINARY_INV, 11, 2)
-    data = pytesseract.image_to_data(thresh, output_type=pytesseract.Output.DICT)
-    
+def _threshold(gray: np.ndarray) -> np.ndarray:
+    return cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_MEAN_C,
+                                 cv2.THRESH_BINARY_INV, 11, 2)
+
+def _match_known_rooms(data: Dict, boxes=None) -> List[Dict]:
+    """
+    Known room labels in Tesseract output. boxes maps each word back to page
+    coordinates (callable (x, y, w, h) -> (x0, y0, x1, y1) or None to drop it).
+    """
     rooms = []
     for i in range(len(data['text'])):
         text = data['text'][i].strip().capitalize()
-        if text in KNOWN_ROOMS and int(data['conf'][i]) > 50:
+        if text in KNOWN_ROOMS and int(float(data['conf'][i])) > 50:
             x, y, w, h = data['left'][i], data['top'][i], data['width'][i], data['height'][i]
-            rooms.append({
-                "room": text,
-                "bbox": (x, y, x + w, y + h)
-            })
+            bbox = (x, y, x + w, y + h) if boxes is None else boxes(x, y, w, h)
+            if bbox is not None:
+                rooms.append({"room": text, "bbox": bbox})
     return rooms
 
+def find_text_regions(gray: np.ndarray) -> List[Tuple[int, int, int, int]]:
+    """
+    Candidate text boxes (x0, y0, x1, y1) in full-resolution coordinates.
+
+    Works on a pyramid level no larger than ROI_MAX_SIDE: glyph-sized connected
+    components of the thresholded image are kept (walls, hatching and furniture
+    outlines fail the size/fill tests), then dilated horizontally so letters
+    of one label merge into a single box.
+    """
+    small, scale = gray, 1
+    while max(small.shape) > ROI_MAX_SIDE:
+        small = cv2.pyrDown(small)
+        scale *= 2
+
+    binary = _threshold(small)
+    _, labels, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+    w, h, area = stats[:, cv2.CC_STAT_WIDTH], stats[:, cv2.CC_STAT_HEIGHT], stats[:, cv2.CC_STAT_AREA]
+    glyph = ((h >= ROI_MIN_GLYPH_PX) & (h <= ROI_MAX_GLYPH_PX) & (w <= 2 * ROI_MAX_GLYPH_PX)
+             & (area >= 0.1 * w * h) & (area <= 0.9 * w * h))
+    glyph[0] = False  # background
+    mask = np.where(glyph[labels], np.uint8(255), np.uint8(0))
+
+    glyph_h = int(np.median(h[glyph])) if glyph.any() else ROI_MIN_GLYPH_PX
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (max(3, glyph_h), max(1, glyph_h // 3)))
+    words = cv2.dilate(mask, kernel)
+    count, _, boxes, _ = cv2.connectedComponentsWithStats(words, connectivity=8)
+
+    regions = []
+    rows, cols = gray.shape
+    for x, y, bw, bh, _ in boxes[1:count]:
+        if bh > 3 * ROI_MAX_GLYPH_PX or bw < bh:  # text labels are wider than tall
+            continue
+        pad = int(bh * ROI_PAD) + 1
+        regions.append((int(max(0, (x - pad) * scale)), int(max(0, (y - pad) * scale)),
+                        int(min(cols, (x + bw + pad) * scale)), int(min(rows, (y + bh + pad) * scale))))
+    return regions
+
+def _ocr_regions(thresh: np.ndarray, regions: List[Tuple[int, int, int, int]]) -> List[Dict]:
+    """
+    OCR all regions in one Tesseract call: crops are stacked into a single
+    mosaic (one process spawn instead of one per crop), and each word is
+    mapped back to the page through its crop's offset.
+    """
+    width = max(x1 - x0 for x0, _, x1, _ in regions) + 2 * ROI_GAP_PX
+    height = sum(y1 - y0 + ROI_GAP_PX for _, y0, _, y1 in regions) + ROI_GAP_PX
+    mosaic = np.zeros((height, width), dtype=thresh.dtype)  # thresh is inverted: 0 = background
+    tops = []
+    top = ROI_GAP_PX
+    for x0, y0, x1, y1 in regions:
+        mosaic[top:top + y1 - y0, ROI_GAP_PX:ROI_GAP_PX + x1 - x0] = thresh[y0:y1, x0:x1]
+        tops.append(top)
+        top += y1 - y0 + ROI_GAP_PX
+    tops = np.array(tops)
+
+    def to_page(x, y, w, h):
+        k = int(np.searchsorted(tops, y, side='right')) - 1
+        if k < 0:
+            return None
+        x0, y0, x1, y1 = regions[k]
+        px, py = x - ROI_GAP_PX + x0, y - int(tops[k]) + y0
+        return (px, py, px + w, py + h)
+
+    data = pytesseract.image_to_data(mosaic, config="--psm 11", output_type=pytesseract.Output.DICT)
+    return _match_known_rooms(data, to_page)
+
+def extract_rooms(img: np.ndarray, fast: bool = True) -> List[Dict]:
+    """
+    Use OCR to detect known room names and locations.
+    img may be BGR or already grayscale (parse_floorplan passes the shared
+    grayscale buffer). With fast=True only candidate text regions are OCR'd;
+    if none are found, so many that cropping saves nothing, or none of them
+    reads as a known room, the whole page is.
+    """
+    gray = img if img.ndim == 2 else cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    thresh = _threshold(gray)
+    if fast:
+        regions = find_text_regions(gray)
+        if 0 < len(regions) <= ROI_MAX_REGIONS:
+            rooms = _ocr_regions(thresh, regions)
+            if rooms:
+                return rooms
+    data = pytesseract.image_to_data(thresh, output_type=pytesseract.Output.DICT)
+    return _match_known_rooms(data)
+
+def compare_ocr_paths(image_path: str) -> Dict:
+    """
+    Recognition check: room labels found by region OCR alone vs. full-page OCR
+    on one plan. "missed" lists labels only the full-page pass read.
+    """
+    _, gray, _ = _load(image_path)
+    thresh = _threshold(gray)
+    regions = find_text_regions(gray)
+    roi = sorted(r["room"] for r in _ocr_regions(thresh, regions)) if regions else []
+    data = pytesseract.image_to_data(thresh, output_type=pytesseract.Output.DICT)
+    full = sorted(r["room"] for r in _match_known_rooms(data))
+    missed = list(full)
+    for room in roi:
+        if room in missed:
+            missed.remove(room)
+    return {"image": image_path, "regions": len(regions), "roi": roi, "full": full, "missed": missed}
+
 def detect_walls(edges: np.ndarray) -> List[Dict]:
     """Detect walls using probabilistic Hough transform."""
-    lines = cv2.HoughLinesP(edges, 1, np.pi / 180, threshold=100, minLineLength=40, maxLineGap=10)
+    lines = cv2.HoughLinesP(edges, **HOUGH_PARAMS)
     wall_lines = []
     if lines is not None:
-        for line in lines:
-            x1, y1, x2, y2 = line[0]
+        # (N, 1, 4) in OpenCV 4, (N, 4) in 5; tolist() also gives JSON-ready ints
+        for x1, y1, x2, y2 in lines.reshape(-1, 4).tolist():
             wall_lines.append({"start": (x1, y1), "end": (x2, y2)})
     return wall_lines
 
@@ -65,27 +201,152 @@ def detect_doors_and_windows(edges: np.ndarray) -> List[Dict]:
             })
     return features
 
-def parse_floorplan(image_path: str) -> Dict:
-    """Full floorplan parsing logic for AI training ingestion."""
-    raw_img, edge_img = preprocess_image(image_path)
-    rooms = extract_rooms(raw_img)
+def _parser_fingerprint() -> str:
+    """Everything besides the pixels that changes parse output."""
+    config = {
+        "version": PARSER_VERSION,
+        "canny": CANNY_PARAMS,
+        "hough": HOUGH_PARAMS,
+        "roi": [ROI_MAX_SIDE, ROI_MIN_GLYPH_PX, ROI_MAX_GLYPH_PX, ROI_MAX_REGIONS, ROI_PAD, ROI_GAP_PX],
+        "known_rooms": KNOWN_ROOMS,
+    }
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()[:16]
+
+def _cache_path(cache_dir: str, raw: bytes) -> str:
+    key = hashlib.sha256(raw).hexdigest()
+    return os.path.join(cache_dir, _parser_fingerprint(), key[:2], f"{key}.json")
+
+def parse_floorplan(image_path: str, cache_dir: str = PARSE_CACHE_DIR) -> Dict:
+    """
+    Full floorplan parsing logic for AI training ingestion.
+    Results are cached under cache_dir by image content hash and parser
+    fingerprint (version + Canny/Hough/ROI parameters), so a re-downloaded
+    copy under a new name, or a re-run over an unchanged corpus, costs one
+    read and one hash. cache_dir=None disables the cache.
+    """
+    with open(image_path, 'rb') as f:
+        raw = f.read()
+    cache_path = _cache_path(cache_dir, raw) if cache_dir else None
+    if cache_path:
+        try:
+            with open(cache_path, 'r') as f:
+                return dict(json.load(f), image=image_path)
+        except (OSError, ValueError):
+            pass
+
+    _, gray, edge_img = _load(image_path, raw)
+    rooms = extract_rooms(gray)
     walls = detect_walls(edge_img)
     doors = detect_doors_and_windows(edge_img)
-    
-    return {
-        "image": image_path,
-        "rooms": rooms,
-        "walls": walls,
-        "features": doors
-    }
 
-if __name__ == "__main__":
-    sample = "data/floorplans/example_plan.jpg"
-    if os.path.exists(sample):
-        result = parse_floorplan(sample)
-        print(f"\nParsed Output for: {sample}")
-        print(f"Rooms ({len(result['rooms'])}): {[r['room'] for r in result['rooms']]}")
-        print(f"Walls Detected: {len(result['walls'])}")
-        print(f"Doors/Windows: {len(result['features'])}")
+    # Round-trip through JSON so fresh and cached results are identical (lists, plain ints)
+    payload = json.dumps({"rooms": rooms, "walls": walls, "features": doors})
+    if cache_path:
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            tmp = f"{cache_path}.tmp{os.getpid()}"
+            with open(tmp, 'w') as f:
+                f.write(payload)
+            os.replace(tmp, cache_path)
+        except OSError:
+            pass  # read-only cache dir: parse without caching
+    return dict(json.loads(payload), image=image_path)
+
+def iter_image_paths(source: Union[str, Iterable[str]]) -> Iterator[str]:
+    """Image files in a directory (sorted), or the given paths as-is."""
+    if isinstance(source, (str, Path)):
+        if not os.path.isdir(source):
+            yield str(source)
+            return
+        for entry in sorted(os.scandir(source), key=lambda e: e.name):
+            if entry.is_file() and entry.name.lower().endswith(IMAGE_EXTENSIONS):
+                yield entry.path
     else:
+        yield from (str(p) for p in source)
+
+def _init_worker():
+    # One image per process at a time; keep OpenCV and Tesseract from spawning
+    # their own thread pools on top of the process pool.
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+    cv2.setNumThreads(1)
+
+def _parse_one(image_path: str, cache_dir: str) -> Dict:
+    try:
+        return parse_floorplan(image_path, cache_dir)
+    except Exception as e:  # one unreadable scan must not end a corpus run
+        return {"image": image_path, "error": f"{type(e).__name__}: {e}"}
+
+def parse_floorplans(source: Union[str, Iterable[str]], workers: int = None,
+                     max_in_flight: int = None, cache_dir: str = PARSE_CACHE_DIR) -> Iterator[Dict]:
+    """
+    Parse a directory (or iterable of paths) with a process pool, yielding
+    each result as soon as its image finishes (completion order, not input order).
+    At most max_in_flight images (default 2 per worker) are submitted at once,
+    so decoded images in memory stay bounded however large the corpus is.
+    Images that fail to parse yield {"image": path, "error": message}.
+    cache_dir is passed to parse_floorplan (None disables the parse cache).
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or workers * 2
+    paths = iter_image_paths(source)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        in_flight = set()
+        for path in paths:
+            in_flight.add(pool.submit(_parse_one, path, cache_dir))
+            if len(in_flight) >= max_in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        while in_flight:
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+if __name__ == "__main__":
+    import json
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Parse floor-plan images into rooms, walls and door/window features.")
+    parser.add_argument("source", nargs="*", default=["data/floorplans/"], help="image files or a directory")
+    parser.add_argument("--workers", type=int, default=None, help="process pool size (default: CPU count)")
+    parser.add_argument("--out", default=None, help="write one JSON result per line to this file")
+    parser.add_argument("--cache-dir", default=PARSE_CACHE_DIR, help="parse cache directory")
+    parser.add_argument("--no-cache", action="store_true", help="always re-parse images")
+    parser.add_argument("--check-ocr", action="store_true",
+                        help="compare region OCR with full-page OCR on each image instead of parsing")
+    args = parser.parse_args()
+
+    source = args.source[0] if len(args.source) == 1 else args.source
+    if isinstance(source, str) and not os.path.exists(source):
         print("❌ No sample image found. Run dataset_scraper.py to generate examples.")
+        raise SystemExit(1)
+
+    if args.check_ocr:
+        images = agree = 0
+        for path in iter_image_paths(source):
+            check = compare_ocr_paths(path)
+            images += 1
+            agree += not check["missed"]
+            status = "✅" if not check["missed"] else f"⚠️ missed {check['missed']}"
+            print(f"{status} {path} | regions: {check['regions']} | roi: {check['roi']} | full: {check['full']}")
+        print(f"🎯 Region OCR matched full-page OCR on {agree}/{images} images.")
+        raise SystemExit(0)
+
+    out = open(args.out, 'w') if args.out else None
+    parsed = failed = 0
+    try:
+        for result in parse_floorplans(source, workers=args.workers,
+                                       cache_dir=None if args.no_cache else args.cache_dir):
+            if "error" in result:
+                failed += 1
+                print(f"❌ {result['image']}: {result['error']}")
+                continue
+            parsed += 1
+            print(f"✅ {result['image']} | Rooms: {[r['room'] for r in result['rooms']]} | "
+                  f"Walls: {len(result['walls'])} | Doors/Windows: {len(result['features'])}")
+            if out:
+                out.write(json.dumps(result, default=int) + "\n")
+    finally:
+        if out:
+            out.close()
+    print(f"🎯 Parsed {parsed} images ({failed} failed).")
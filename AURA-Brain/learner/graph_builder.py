@@ -1,71 +1,344 @@
-# learner/floorplan_parser.py
-# Phase 1: Parse Floorplan Images into AI-Usable Representations
-
-import cv2
-import os
-import numpy as np
-import pytesseract
-from pathlib import Path
-from typing import List, Dict
-
-# Define room labels for classification
-KNOWN_ROOMS = ["Living", "Bedroom", "Kitchen", "Bathroom", "Toilet", "Dining", "Garage", "Balcony", "Store", "Office"]
-
-def preprocess_image(image_path: str) -> np.ndarray:
-    """Load and clean up image for OCR."""
-    img = cv2.imread(image_path)
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-    blur = cv2.GaussianBlur(gray, (3, 3), 0)
-    thresh = cv2.adaptiveThreshold(blur, 255, cv2.ADAPTIVE_THRESH_MEAN_C,
-                                   cv2.THRESH_BINARY_INV, 11, 2)
-    return thresh
-
-def extract_text_regions(thresh_img: np.ndarray) -> List[Dict]:
-    """Use OCR to detect room names and bounding boxes."""
-    results = []
-    d = pytesseract.image_to_data(thresh_img, output_type=pytesseract.Output.DICT)
-    for i in range(len(d['text'])):
-        if int(d['conf'][i]) > 60:
-            text = d['text'][i].strip().capitalize()
-            for known_room in KNOWN_ROOMS:
-                if known_room in text:
-                    x, y, w, h = d['left'][i], d['top'][i], d['width'][i], d['height'][i]
-                    results.append({
-                        "room": known_room,
-                        "bbox": (x, y, x + w, y + h)
-                    })
-                    break
-    return results
-
-def detect_walls(thresh_img: np.ndarray) -> List[Dict]:
-    """Very simple wall detector using contours (for now)."""
-    contours, _ = cv2.findContours(thresh_img, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-    walls = []
-    for cnt in contours:
-        approx = cv2.approxPolyDP(cnt, 3, True)
-        x, y, w, h = cv2.boundingRect(approx)
-        if w > 20 and h > 20:  # Filter out noise
-            walls.append({"bbox": (x, y, x + w, y + h)})
-    return walls
-
-def parse_floorplan(image_path: str) -> Dict:
-    """Main function to extract structured floorplan data."""
-    thresh = preprocess_image(image_path)
-    rooms = extract_text_regions(thresh)
-    walls = detect_walls(thresh)
-    return {
-        "image_path": image_path,
-        "rooms": rooms,
-        "walls": walls
-    }
+# learner/graph_builder.py
+# Compact room graph used by training and the API: rooms as slotted records, doors as edge lists
+
+import math
+from typing import Dict, Iterator, List, Optional, Tuple
+
+_CORE_FIELDS = ("name", "type", "area")
+
+
+class Room:
+    """
+    One room. Behaves like the dict NetworkX would hand out for a node
+    (room["area"], room.get("type")), but stores the common fields in slots
+    and keeps the owning graph's aggregates current when area or perimeter change.
+    """
+    __slots__ = ("_graph", "name", "type", "area", "attrs", "_wall")
+
+    def __init__(self, name: str, type: str = "", area: float = 0.0, attrs: Optional[dict] = None):
+        self._graph = None
+        self.name = name
+        self.type = type
+        self.area = float(area)
+        self.attrs = attrs or {}
+        self._wall = self.wall_length()
+
+    def wall_length(self) -> float:
+        """Room perimeter if known, else that of a square room of the same area."""
+        perimeter = self.attrs.get("perimeter")
+        if perimeter is not None:
+            return float(perimeter)
+        return 4 * math.sqrt(max(self.area, 0.0))
+
+    def __getitem__(self, key):
+        if key in _CORE_FIELDS:
+            return getattr(self, key)
+        return self.attrs[key]
+
+    def __setitem__(self, key, value):
+        old_area, old_wall = self.area, self._wall
+        if key in _CORE_FIELDS:
+            setattr(self, key, float(value) if key == "area" else value)
+        else:
+            self.attrs[key] = value
+        if key in ("area", "perimeter"):
+            self._wall = self.wall_length()
+            if self._graph is not None:
+                self._graph._retotal(self.area - old_area, self._wall - old_wall)
+        if self._graph is not None:
+            self._graph.revision += 1
+
+    def pop(self, key, default=None):
+        """Remove an extra attribute (core fields cannot be removed)."""
+        if key in _CORE_FIELDS:
+            raise KeyError(key)
+        value = self.attrs.pop(key, default)
+        if key == "perimeter":
+            old_wall, self._wall = self._wall, self.wall_length()
+            if self._graph is not None:
+                self._graph._retotal(0.0, self._wall - old_wall)
+        if self._graph is not None:
+            self._graph.revision += 1
+        return value
+
+    def __contains__(self, key) -> bool:
+        return key in _CORE_FIELDS or key in self.attrs
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def keys(self):
+        return list(_CORE_FIELDS) + list(self.attrs)
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(_CORE_FIELDS) + len(self.attrs)
+
+    def to_dict(self) -> dict:
+        return dict(self.items())
+
+    def __repr__(self) -> str:
+        return f"Room({self.to_dict()!r})"
+
+
+class _NodeView:
+    """graph.nodes() / graph.nodes(data=True) / graph.nodes[node], as in NetworkX."""
+    __slots__ = ("_graph",)
+
+    def __init__(self, graph: "RoomGraph"):
+        self._graph = graph
+
+    def __call__(self, data: bool = False):
+        if data:
+            return list(zip(self._graph._ids, self._graph._rooms))
+        return list(self._graph._ids)
+
+    def __getitem__(self, node) -> Room:
+        return self._graph._rooms[self._graph._index[node]]
+
+    def __iter__(self):
+        return iter(self._graph._ids)
+
+    def __contains__(self, node) -> bool:
+        return node in self._graph._index
+
+    def __len__(self) -> int:
+        return len(self._graph._ids)
+
+
+class RoomGraph:
+    """
+    Room adjacency graph with NetworkX-style read access.
+
+    Rooms live in a list of slotted Room records indexed by position; doors are
+    stored once in an edge list plus per-room neighbour sets of positions.
+    Total room area and wall length are maintained incrementally, so
+    total_footprint() and total_wall_length() are O(1).
+    The footprint is the building envelope if one was given, else the sum of room areas.
+    revision increases on every room or door change, so caches derived from the
+    graph (e.g. ScoringEngine aggregates) can tell when they are stale.
+    """
+
+    def __init__(self, footprint: Optional[float] = None):
+        self.graph: Dict = {}
+        self.footprint = footprint
+        self.nodes = _NodeView(self)
+        self._ids: List = []
+        self._index: Dict = {}
+        self._rooms: List[Room] = []
+        self._adj: List[set] = []
+        self._area_sum = 0.0
+        self._wall_sum = 0.0
+        self.revision = 0
+
+    # --- construction ------------------------------------------------------
+
+    def add_room(self, room: Room, node=None):
+        node = room.name if node is None else node
+        if node in self._index:
+            raise ValueError(f"Duplicate room id: {node}")
+        room._graph = self
+        self._index[node] = len(self._ids)
+        self._ids.append(node)
+        self._rooms.append(room)
+        self._adj.append(set())
+        self._retotal(room.area, room._wall)
+        self.revision += 1
+        return node
+
+    def add_edge(self, u, v):
+        """Add a door between two rooms; a door from a room to itself is rejected."""
+        if u == v:
+            raise ValueError(f"Self-loop door on {u!r}")
+        self._adj[self._index[u]].add(self._index[v])
+        self._adj[self._index[v]].add(self._index[u])
+        self.revision += 1
+
+    def remove_edge(self, u, v):
+        self._adj[self._index[u]].remove(self._index[v])
+        self._adj[self._index[v]].remove(self._index[u])
+        self.revision += 1
 
-if __name__ == '__main__':
-    sample = "data/floorplans/example_plan.jpg"
-    if os.path.exists(sample):
-        parsed = parse_floorplan(sample)
-        print("Parsed Plan:")
-        for room in parsed['rooms']:
-            print(room)
-        print(f"Total walls detected: {len(parsed['walls'])}")
-    else:
-        print("Sample image not found. Run dataset_scraper.py first.")
+    def _retotal(self, area_delta: float, wall_delta: float):
+        self._area_sum += area_delta
+        self._wall_sum += wall_delta
+
+    # --- NetworkX-style reads ----------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __iter__(self) -> Iterator:
+        return iter(self._ids)
+
+    def __contains__(self, node) -> bool:
+        return node in self._index
+
+    def number_of_nodes(self) -> int:
+        return len(self._ids)
+
+    def number_of_edges(self) -> int:
+        return sum(len(n) for n in self._adj) // 2
+
+    def degree(self, node) -> int:
+        return len(self._adj[self._index[node]])
+
+    def neighbors(self, node) -> List:
+        return [self._ids[j] for j in self._adj[self._index[node]]]
+
+    def has_edge(self, u, v) -> bool:
+        return u in self._index and v in self._index and self._index[v] in self._adj[self._index[u]]
+
+    def edge_index(self) -> List[Tuple[int, int]]:
+        """Doors as (i, j) room positions with i < j."""
+        return [(i, j) for i, nbrs in enumerate(self._adj) for j in nbrs if i < j]
+
+    def edges(self) -> List[Tuple]:
+        return [(self._ids[i], self._ids[j]) for i, j in self.edge_index()]
+
+    # --- aggregates ----------------------------------------------------------
+
+    def total_room_area(self) -> float:
+        return self._area_sum
+
+    def total_footprint(self) -> float:
+        return self.footprint if self.footprint is not None else self._area_sum
+
+    def total_wall_length(self) -> float:
+        return self._wall_sum
+
+    def overlay_totals(self, node_changes: Dict) -> Tuple[float, float]:
+        """
+        (footprint, wall length) as they would be with node_changes
+        ({node: {attr: value}}) applied; used by GraphOverlay without copying rooms.
+        """
+        area_delta = wall_delta = 0.0
+        for node, changes in node_changes.items():
+            if "area" not in changes and "perimeter" not in changes:
+                continue
+            room = self.nodes[node]
+            attrs = dict(room.attrs)
+            attrs.update({k: v for k, v in changes.items() if k not in _CORE_FIELDS})
+            probe = Room(room.name, room.type, changes.get("area", room.area), attrs)
+            area_delta += probe.area - room.area
+            wall_delta += probe._wall - room._wall
+        footprint = self.footprint if self.footprint is not None else self._area_sum + area_delta
+        return footprint, self._wall_sum + wall_delta
+
+    # --- export --------------------------------------------------------------
+
+    def to_dict(self) -> dict:
+        return {
+            "rooms": [dict(room.to_dict(), id=node) for node, room in zip(self._ids, self._rooms)],
+            "edges": [list(edge) for edge in self.edges()],
+            "footprint": self.total_footprint(),
+            "total_wall_length": round(self._wall_sum, 2),
+        }
+
+    def extract_materials(self) -> Dict[str, float]:
+        """
+        Material quantities for the plan: floor area and wall length, plus any
+        per-room "materials" ({material: quantity}) summed across rooms.
+        """
+        materials = {
+            "floor_area_m2": round(self._area_sum, 2),
+            "wall_length_m": round(self._wall_sum, 2),
+        }
+        for room in self._rooms:
+            for material, qty in room.attrs.get("materials", {}).items():
+                materials[material] = materials.get(material, 0) + qty
+        return materials
+
+
+def _room_from_dict(raw: dict) -> Room:
+    name = raw.get("name") or raw.get("room") or raw.get("type", "Room")
+    attrs = {k: v for k, v in raw.items() if k not in _CORE_FIELDS and k != "id"}
+    return Room(name, raw.get("type") or raw.get("room", ""), raw.get("area", 0.0), attrs)
+
+
+def _endpoints(edge) -> Tuple:
+    try:
+        if isinstance(edge, dict):
+            return edge["from"], edge["to"]
+        u, v = edge
+        return u, v
+    except (KeyError, TypeError, ValueError):
+        raise ValueError(f"Edge {edge!r}: expected [a, b] or {{'from': a, 'to': b}}") from None
+
+
+def build_graph_from_rooms(rooms: List[Dict], edges: Optional[List] = None,
+                           footprint: Optional[float] = None) -> RoomGraph:
+    """
+    Build a RoomGraph from room dicts (name/type/area plus any extra fields).
+    Repeated names get a numeric suffix. Doors come from edges ([a, b] or
+    {"from": a, "to": b}) and from each room's optional "connects_to" list.
+    Raises ValueError for an edge or connects_to entry naming an unknown room
+    or the room itself, or a name shared by several rooms (give those rooms
+    distinct "id"s to connect them).
+    """
+    graph = RoomGraph(footprint)
+    ambiguous = set()
+    for raw in rooms:
+        room = _room_from_dict(raw)
+        node = raw.get("id", room.name)
+        if node in graph:
+            ambiguous.add(node)
+        suffix = 2
+        while node in graph:
+            node = f"{room.name} {suffix}"
+            suffix += 1
+        graph.add_room(room, node)
+
+    def check(edge, ends):
+        for end in ends:
+            if end in ambiguous:
+                raise ValueError(f"Edge {edge!r}: {end!r} names more than one room")
+            if end not in graph:
+                raise ValueError(f"Edge {edge!r}: no room named {end!r}")
+
+    def connect(edge, u, v):
+        if u == v:
+            raise ValueError(f"Edge {edge!r}: a room can't have a door to itself")
+        graph.add_edge(u, v)
+
+    for edge in edges or []:
+        ends = _endpoints(edge)
+        check(edge, ends)
+        connect(edge, *ends)
+    for node, room in graph.nodes(data=True):
+        for other in room.attrs.get("connects_to", []):
+            edge = {"from": node, "to": other}
+            check(edge, (other,))  # node itself is known, even if its name was shared
+            connect(edge, node, other)
+    return graph
+
+
+def build_graph_from_json(raw: dict) -> RoomGraph:
+    """
+    Build a RoomGraph from a parsed plan: {"rooms": [...], "edges" | "doors" | "connections": [...],
+    "footprint": optional envelope area in m²}.
+    """
+    edges = raw.get("edges") or raw.get("doors") or raw.get("connections") or []
+    return build_graph_from_rooms(raw.get("rooms", []), edges, raw.get("footprint"))
+
+
+if __name__ == "__main__":
+    plan = {
+        "footprint": 120.0,
+        "rooms": [
+            {"name": "Living", "type": "Living", "area": 24.0},
+            {"name": "Kitchen", "type": "Kitchen", "area": 12.0, "materials": {"ceramic_tile": 12.0}},
+            {"name": "Bedroom", "type": "Bedroom", "area": 14.0},
+            {"name": "Bathroom", "type": "Bathroom", "area": 5.0},
+        ],
+        "edges": [["Living", "Kitchen"], ["Living", "Bedroom"], ["Bedroom", "Bathroom"]],
+    }
+    graph = build_graph_from_json(plan)
+    print(f"Rooms: {len(graph)} | Doors: {graph.number_of_edges()}")
+    print(f"Footprint: {graph.total_footprint()} m² | Walls: {graph.total_wall_length():.2f} m")
+    print("Materials:", graph.extract_materials())
@@ -0,0 +1,269 @@
+# learner/graph_overlay.py
+# Copy-on-write view of a RoomGraph for exploring candidate plan mutations
+
+from typing import Dict, Iterator, Set, Tuple
+
+from learner.graph_builder import _CORE_FIELDS
+
+_DELETED = object()
+
+
+class RoomView:
+    """Dict-like room record: reads fall through to the base, writes go to the overlay delta."""
+    __slots__ = ("_overlay", "_node")
+
+    def __init__(self, overlay: "GraphOverlay", node):
+        self._overlay = overlay
+        self._node = node
+
+    def _merged(self) -> dict:
+        merged = dict(self._overlay.base.nodes[self._node])
+        for key, value in self._overlay._node_changes.get(self._node, {}).items():
+            if value is _DELETED:
+                merged.pop(key, None)
+            else:
+                merged[key] = value
+        return merged
+
+    def __getitem__(self, key):
+        delta = self._overlay._node_changes.get(self._node, {})
+        if key in delta:
+            if delta[key] is _DELETED:
+                raise KeyError(key)
+            return delta[key]
+        return self._overlay.base.nodes[self._node][key]
+
+    def __setitem__(self, key, value):
+        self._overlay.set_room_attr(self._node, key, value)
+
+    def __delitem__(self, key):
+        """Remove an extra attribute (core fields cannot be removed, as with Room.pop)."""
+        if key in _CORE_FIELDS:
+            raise KeyError(key)
+        self[key]  # KeyError if absent
+        self._overlay.set_room_attr(self._node, key, _DELETED)
+
+    def __contains__(self, key) -> bool:
+        try:
+            self[key]
+            return True
+        except KeyError:
+            return False
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return self._merged().keys()
+
+    def items(self):
+        return self._merged().items()
+
+    def values(self):
+        return self._merged().values()
+
+    def __iter__(self):
+        return iter(self._merged())
+
+    def __len__(self) -> int:
+        return len(self._merged())
+
+    def __repr__(self) -> str:
+        return repr(self._merged())
+
+
+class _OverlayNodes:
+    """Supports both overlay.nodes(data=True) and overlay.nodes[node], like NetworkX."""
+    __slots__ = ("_overlay",)
+
+    def __init__(self, overlay: "GraphOverlay"):
+        self._overlay = overlay
+
+    def __call__(self, data: bool = False):
+        if data:
+            return [(node, RoomView(self._overlay, node)) for node in self._overlay.base.nodes()]
+        return list(self._overlay.base.nodes())
+
+    def __getitem__(self, node) -> RoomView:
+        if node not in self._overlay.base.nodes:
+            raise KeyError(node)
+        return RoomView(self._overlay, node)
+
+    def __iter__(self):
+        return iter(self._overlay.base.nodes())
+
+    def __contains__(self, node) -> bool:
+        return node in self._overlay.base.nodes
+
+    def __len__(self) -> int:
+        return len(self._overlay.base.nodes())
+
+
+class GraphOverlay:
+    """
+    Lightweight delta over a shared base RoomGraph.
+
+    Room attribute writes and door additions/removals are recorded in the
+    overlay and never touch the base, so thousands of candidate variants can
+    share one base plan. Reads merge the delta over the base. commit() applies
+    the delta to the base; rollback() discards it. The overlay keeps its own
+    graph-level dict (used for score caches) separate from the base's; its
+    revision combines the base's with its own write counter.
+    """
+
+    def __init__(self, base):
+        self.base = base
+        self.graph: Dict = {}
+        self._node_changes: Dict = {}
+        self._added: Set[frozenset] = set()
+        self._removed: Set[frozenset] = set()
+        self.nodes = _OverlayNodes(self)
+        self._writes = 0
+
+    @property
+    def revision(self):
+        return (getattr(self.base, "revision", None), self._writes)
+
+    # --- reads -------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def __iter__(self) -> Iterator:
+        return iter(self.nodes)
+
+    def __contains__(self, node) -> bool:
+        return node in self.nodes
+
+    def number_of_nodes(self) -> int:
+        return len(self.nodes)
+
+    def has_edge(self, u, v) -> bool:
+        key = frozenset((u, v))
+        if key in self._added:
+            return True
+        return key not in self._removed and self.base.has_edge(u, v)
+
+    def edges(self):
+        kept = [(u, v) for u, v in self.base.edges() if frozenset((u, v)) not in self._removed]
+        return kept + [tuple(edge) for edge in self._added]
+
+    def number_of_edges(self) -> int:
+        return self.base.number_of_edges() - len(self._removed) + len(self._added)
+
+    def degree(self, node) -> int:
+        delta = sum(node in edge for edge in self._added) - sum(node in edge for edge in self._removed)
+        return self.base.degree(node) + delta
+
+    def neighbors(self, node):
+        out = [n for n in self.base.neighbors(node) if frozenset((node, n)) not in self._removed]
+        return out + [next(iter(edge - {node})) for edge in self._added if node in edge]
+
+    def total_footprint(self):
+        if hasattr(self.base, "overlay_totals"):
+            return self.base.overlay_totals(self._live_changes())[0]
+        # Generic graphs read rooms through the public graph API, so they see the delta
+        return type(self.base).total_footprint(self)
+
+    def total_wall_length(self):
+        if hasattr(self.base, "overlay_totals"):
+            return self.base.overlay_totals(self._live_changes())[1]
+        return type(self.base).total_wall_length(self)
+
+    def _live_changes(self) -> Dict:
+        # Removed attributes are passed as None, which RoomGraph treats as unset
+        return {
+            node: {k: (None if v is _DELETED else v) for k, v in changes.items()}
+            for node, changes in self._node_changes.items()
+        }
+
+    # --- writes ------------------------------------------------------------
+
+    def set_room_attr(self, node, key, value):
+        if node not in self.nodes:
+            raise KeyError(node)
+        self._node_changes.setdefault(node, {})[key] = value
+        self._writes += 1
+
+    def add_edge(self, u, v):
+        if u not in self.nodes or v not in self.nodes:
+            raise KeyError((u, v))
+        if u == v:
+            raise ValueError(f"Self-loop door on {u!r}")
+        key = frozenset((u, v))
+        if key in self._removed:
+            self._removed.discard(key)
+        elif not self.base.has_edge(u, v):
+            self._added.add(key)
+        self._writes += 1
+
+    def remove_edge(self, u, v):
+        key = frozenset((u, v))
+        if key in self._added:
+            self._added.discard(key)
+        elif self.base.has_edge(u, v):
+            self._removed.add(key)
+        else:
+            raise KeyError((u, v))
+        self._writes += 1
+
+    # --- delta management --------------------------------------------------
+
+    def changed_nodes(self) -> Set:
+        """Rooms whose attributes or doors differ from the base."""
+        touched = set(self._node_changes)
+        for edge in self._added | self._removed:
+            touched |= edge
+        return touched
+
+    def delta(self) -> Tuple[Dict, Set, Set]:
+        return self._node_changes, self._added, self._removed
+
+    def rollback(self):
+        self._node_changes = {}
+        self._added = set()
+        self._removed = set()
+        self._writes += 1
+        self.graph.clear()
+
+    def commit(self):
+        """
+        Apply the delta to the base graph and start a fresh delta. The delta is
+        checked against the base first, so a commit either applies fully or
+        raises with neither the base nor the delta changed.
+        """
+        self._check_commit()
+        for node, changes in self._node_changes.items():
+            room = self.base.nodes[node]
+            for key, value in changes.items():
+                if value is _DELETED:
+                    room.pop(key, None)
+                else:
+                    room[key] = value
+        for edge in self._removed:
+            self.base.remove_edge(*edge)
+        for edge in self._added:
+            self.base.add_edge(*edge)
+        changed = self.changed_nodes()
+        self._writes += 1
+        self._node_changes = {}
+        self._added = set()
+        self._removed = set()
+        return changed
+
+    def _check_commit(self):
+        for node, changes in self._node_changes.items():
+            if node not in self.base.nodes:
+                raise KeyError(node)
+            if "area" in changes:
+                float(changes["area"])  # ValueError/TypeError before anything is written
+        for edge in self._removed:
+            if not self.base.has_edge(*edge):
+                raise KeyError(tuple(edge))
+        for edge in self._added:
+            for node in edge:
+                if node not in self.base.nodes:
+                    raise KeyError(node)
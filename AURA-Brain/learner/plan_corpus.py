@@ -0,0 +1,236 @@
+# learner/plan_corpus.py
+# Packed columnar corpus of floor-plan graphs: one directory of .npy columns, memory-mapped on read
+
+import os
+import json
+import hashlib
+from typing import Iterable, Iterator, Optional, Tuple
+import numpy as np
+
+from learner.graph_builder import Room, RoomGraph, build_graph_from_json
+
+CORPUS_VERSION = 2
+
+# Column files; rooms and edges of plan p live at [offsets[p]:offsets[p + 1]],
+# materials of room r at [material_offsets[r]:material_offsets[r + 1]]
+ROOM_COLUMNS = ("room_id", "room_name", "room_type", "room_area", "room_perimeter",
+                "room_light", "room_windows", "material_offsets")
+MATERIAL_COLUMNS = ("material_id", "material_qty")
+EDGE_COLUMNS = ("edge_src", "edge_dst")
+PLAN_COLUMNS = ("room_offsets", "edge_offsets", "footprint")
+
+# Room attributes with a column; "connects_to" is already stored as edges
+PACKED_ATTRS = ("perimeter", "natural_light", "windows", "materials", "connects_to")
+
+
+def _flag(value, plan: str, node, field: str) -> int:
+    """1 / 0 for a boolean-like attribute, -1 when absent."""
+    if value is None:
+        return -1
+    if isinstance(value, bool) or value in (0, 1):
+        return int(value)
+    raise ValueError(f"{plan}: room {node!r} {field}={value!r} can't be packed (expected true/false)")
+
+
+def _count(value, plan: str, node, field: str) -> int:
+    """Non-negative integer attribute, -1 when absent."""
+    if value is None:
+        return -1
+    if isinstance(value, (bool, int)) and value >= 0:
+        return int(value)
+    raise ValueError(f"{plan}: room {node!r} {field}={value!r} can't be packed (expected a count)")
+
+
+def write_corpus(plans: Iterable[Tuple[str, RoomGraph, str]], out_dir: str) -> int:
+    """
+    Pack (name, graph, sha256) plans into out_dir:
+      room_id / room_name / room_type / room_area / room_perimeter  - one row per room
+      room_light / room_windows                  - natural_light (1/0) and windows count, -1 if absent
+      material_offsets / material_id / material_qty  - each room's "materials" quantities
+      edge_src / edge_dst                        - int32 room positions within the plan
+      room_offsets / edge_offsets / footprint    - one row per plan (+1 for offsets)
+      meta.json                                  - plan names, hashes, room type and material vocabularies
+    A room attribute with no column raises ValueError rather than being dropped,
+    so a corpus plan always rebuilds into the graph its JSON would give.
+    """
+    names, hashes = [], []
+    room_ids, room_names, room_types, areas, perimeters, light, windows = [], [], [], [], [], [], []
+    material_offsets, material_ids, material_qty = [0], [], []
+    edge_src, edge_dst = [], []
+    room_offsets, edge_offsets, footprints = [0], [0], []
+    vocab, materials = {}, {}
+
+    for name, graph, digest in plans:
+        names.append(name)
+        hashes.append(digest)
+        for node, room in graph.nodes(data=True):
+            unpacked = set(room.attrs) - set(PACKED_ATTRS)
+            if unpacked:
+                raise ValueError(f"{name}: room {node!r} has attributes the corpus can't store: {sorted(unpacked)}")
+            room_ids.append(str(node))
+            room_names.append(room.name)
+            room_types.append(vocab.setdefault(room.type, len(vocab)))
+            areas.append(room.area)
+            perimeters.append(room.attrs.get("perimeter", np.nan))
+            light.append(_flag(room.attrs.get("natural_light"), name, node, "natural_light"))
+            windows.append(_count(room.attrs.get("windows"), name, node, "windows"))
+            for material, qty in room.attrs.get("materials", {}).items():
+                material_ids.append(materials.setdefault(material, len(materials)))
+                material_qty.append(qty)
+            material_offsets.append(len(material_ids))
+        for i, j in graph.edge_index():
+            edge_src.append(i)
+            edge_dst.append(j)
+        room_offsets.append(len(room_names))
+        edge_offsets.append(len(edge_src))
+        footprints.append(np.nan if graph.footprint is None else graph.footprint)
+
+    os.makedirs(out_dir, exist_ok=True)
+    columns = {
+        "room_id": np.array(room_ids, dtype=str),
+        "room_name": np.array(room_names, dtype=str),
+        "room_type": np.array(room_types, dtype=np.int32),
+        "room_area": np.array(areas, dtype=np.float64),
+        "room_perimeter": np.array(perimeters, dtype=np.float64),
+        "room_light": np.array(light, dtype=np.int8),
+        "room_windows": np.array(windows, dtype=np.int32),
+        "material_offsets": np.array(material_offsets, dtype=np.int64),
+        "material_id": np.array(material_ids, dtype=np.int32),
+        "material_qty": np.array(material_qty, dtype=np.float64),
+        "edge_src": np.array(edge_src, dtype=np.int32),
+        "edge_dst": np.array(edge_dst, dtype=np.int32),
+        "room_offsets": np.array(room_offsets, dtype=np.int64),
+        "edge_offsets": np.array(edge_offsets, dtype=np.int64),
+        "footprint": np.array(footprints, dtype=np.float64),
+    }
+    for column, values in columns.items():
+        np.save(os.path.join(out_dir, f"{column}.npy"), values)
+    with open(os.path.join(out_dir, "meta.json"), 'w') as f:
+        json.dump({
+            "version": CORPUS_VERSION,
+            "plans": names,
+            "sha256": hashes,
+            "types": sorted(vocab, key=vocab.get),
+            "materials": sorted(materials, key=materials.get),
+        }, f)
+    return len(names)
+
+
+def convert_json_dir(data_dir: str, out_dir: str) -> int:
+    """Convert a directory of JSON plans (as read by FeedbackLoop) into a packed corpus."""
+    def plans():
+        for file in sorted(os.listdir(data_dir)):
+            if not file.endswith(".json"):
+                continue
+            with open(os.path.join(data_dir, file), 'rb') as f:
+                raw = f.read()
+            yield file, build_graph_from_json(json.loads(raw)), hashlib.sha256(raw).hexdigest()
+    return write_corpus(plans(), out_dir)
+
+
+class PlanCorpus:
+    """
+    Zero-copy reader for a packed corpus. Every column is memory-mapped
+    read-only, so opening the corpus costs one small JSON read no matter how
+    many plans it holds, and worker processes share the pages via the OS cache.
+    """
+
+    def __init__(self, corpus_dir: str):
+        self.corpus_dir = corpus_dir
+        with open(os.path.join(corpus_dir, "meta.json"), 'r') as f:
+            meta = json.load(f)
+        if meta.get("version") != CORPUS_VERSION:
+            raise ValueError(f"Unsupported corpus version: {meta.get('version')}")
+        self.names = meta["plans"]
+        self.hashes = meta["sha256"]
+        self.types = meta["types"]
+        self.materials = meta["materials"]
+        for column in ROOM_COLUMNS + MATERIAL_COLUMNS + EDGE_COLUMNS + PLAN_COLUMNS:
+            setattr(self, column, np.load(os.path.join(corpus_dir, f"{column}.npy"), mmap_mode='r'))
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def rooms(self, p: int) -> slice:
+        return slice(int(self.room_offsets[p]), int(self.room_offsets[p + 1]))
+
+    def edges(self, p: int) -> slice:
+        return slice(int(self.edge_offsets[p]), int(self.edge_offsets[p + 1]))
+
+    def graph(self, p: int) -> RoomGraph:
+        """Materialize plan p as a RoomGraph (same room ids and attributes as the source plan)."""
+        footprint = float(self.footprint[p])
+        graph = RoomGraph(None if np.isnan(footprint) else footprint)
+        rooms = self.rooms(p)
+        ids = []
+        for r in range(rooms.start, rooms.stop):
+            attrs = {}
+            if not np.isnan(self.room_perimeter[r]):
+                attrs["perimeter"] = float(self.room_perimeter[r])
+            if self.room_light[r] >= 0:
+                attrs["natural_light"] = bool(self.room_light[r])
+            if self.room_windows[r] >= 0:
+                attrs["windows"] = int(self.room_windows[r])
+            first, last = int(self.material_offsets[r]), int(self.material_offsets[r + 1])
+            if last > first:
+                attrs["materials"] = {self.materials[m]: float(q) for m, q in
+                                      zip(self.material_id[first:last], self.material_qty[first:last])}
+            room = Room(str(self.room_name[r]), self.types[self.room_type[r]], float(self.room_area[r]), attrs)
+            ids.append(graph.add_room(room, str(self.room_id[r])))
+        edges = self.edges(p)
+        for i, j in zip(self.edge_src[edges], self.edge_dst[edges]):
+            graph.add_edge(ids[i], ids[j])
+        return graph
+
+    def iter_graphs(self, skip: Optional[dict] = None) -> Iterator[Tuple[str, RoomGraph, str]]:
+        """
+        Yield (name, graph, sha256), skipping plans whose hash matches skip[name]
+        (e.g. a FeedbackLoop manifest).
+        """
+        skip = skip or {}
+        for p, (name, digest) in enumerate(zip(self.names, self.hashes)):
+            if skip.get(name) != digest:
+                yield name, self.graph(p), digest
+
+    # --- whole-corpus columns for batch scorers -----------------------------
+
+    def total_room_area(self) -> np.ndarray:
+        """Sum of room areas per plan, straight from the mapped column."""
+        counts = np.diff(self.room_offsets)
+        totals = np.zeros(len(self))
+        nonempty = counts > 0
+        if nonempty.any():
+            totals[nonempty] = np.add.reduceat(self.room_area, self.room_offsets[:-1][nonempty])
+        return totals
+
+    def light_flags(self) -> np.ndarray:
+        """
+        Per-room daylight flag (1 / 0 / -1 unknown), as RoomConstraints reads it
+        from a graph: natural_light if given, else whether there are windows.
+        """
+        windows = np.where(self.room_windows < 0, -1, (self.room_windows > 0).astype(np.int8))
+        return np.where(self.room_light >= 0, self.room_light, windows).astype(np.int8)
+
+    def edge_type_ids(self, adjacency) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Affinity-matrix rows for both ends of every edge in the corpus, ready for
+        AdjacencyMatrix.score_batch(src, dst, self.edge_offsets).
+        """
+        type_rows = adjacency.type_ids(self.types)
+        edge_plan = np.repeat(np.arange(len(self)), np.diff(self.edge_offsets))
+        base = self.room_offsets[:-1][edge_plan]
+        room_types = self.room_type
+        return (type_rows[room_types[base + self.edge_src]],
+                type_rows[room_types[base + self.edge_dst]])
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Pack a directory of JSON plans into a columnar corpus.")
+    parser.add_argument("data_dir", nargs="?", default="data/floorplans/")
+    parser.add_argument("out_dir", nargs="?", default="data/corpus/")
+    args = parser.parse_args()
+
+    count = convert_json_dir(args.data_dir, args.out_dir)
+    print(f"📦 Packed {count} plans into {args.out_dir}")
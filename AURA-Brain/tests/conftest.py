@@ -0,0 +1,12 @@
+# tests/conftest.py
+# Lets the tests run from any directory: AURA-Brain goes on sys.path for the
+# learner/knowledge/... imports, and becomes the working directory because
+# knowledge paths are relative. Done at import so test modules see both.
+
+import os
+import sys
+
+AURA_BRAIN = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, AURA_BRAIN)
+os.chdir(AURA_BRAIN)
@@ -0,0 +1,47 @@
+# tests/test_floorplan_parser.py
+# Recognition check: region OCR must read the same room labels as full-page OCR.
+# Run:  python -m pytest AURA-Brain/tests  (tests/conftest.py sets the path and working directory)
+
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+pytesseract = pytest.importorskip("pytesseract")
+
+try:
+    pytesseract.get_tesseract_version()
+except pytesseract.TesseractNotFoundError:
+    pytest.skip("tesseract binary not installed", allow_module_level=True)
+
+import numpy as np
+
+from learner.floorplan_parser import compare_ocr_paths, extract_rooms
+
+# (label, room rectangle) on a white page; labels sit in the room centres
+SAMPLE_PLANS = {
+    "two_rooms": (800, 500, [("Living", (40, 40, 420, 460)), ("Kitchen", (420, 40, 760, 460))]),
+    "four_rooms": (1600, 1200, [
+        ("Bedroom", (60, 60, 800, 600)), ("Bathroom", (800, 60, 1540, 600)),
+        ("Dining", (60, 600, 800, 1140)), ("Garage", (800, 600, 1540, 1140)),
+    ]),
+}
+
+
+def _draw(path, width, height, rooms):
+    img = np.full((height, width, 3), 255, dtype=np.uint8)
+    for label, (x0, y0, x1, y1) in rooms:
+        cv2.rectangle(img, (x0, y0), (x1, y1), (0, 0, 0), 6)
+        (tw, th), _ = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 1.2, 2)
+        cv2.putText(img, label, ((x0 + x1 - tw) // 2, (y0 + y1 + th) // 2),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 0, 0), 2)
+    cv2.imwrite(str(path), img)
+
+
+@pytest.mark.parametrize("name", sorted(SAMPLE_PLANS))
+def test_region_ocr_matches_full_page(tmp_path, name):
+    width, height, rooms = SAMPLE_PLANS[name]
+    path = tmp_path / f"{name}.png"
+    _draw(path, width, height, rooms)
+
+    check = compare_ocr_paths(str(path))
+    assert check["missed"] == []
+    assert sorted(r["room"] for r in extract_rooms(cv2.imread(str(path)))) == check["full"]
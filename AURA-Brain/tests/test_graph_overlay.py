@@ -0,0 +1,131 @@
+# tests/test_graph_overlay.py
+# GraphOverlay commit/rollback: random edits through an overlay must match the same edits applied directly.
+# Run:  python -m pytest AURA-Brain/tests  (tests/conftest.py sets the path and working directory)
+
+import random
+
+import pytest
+
+from learner.graph_builder import build_graph_from_rooms
+from learner.graph_overlay import GraphOverlay
+
+ROOMS = [
+    {"name": "Living", "type": "Living", "area": 20.0},
+    {"name": "Kitchen", "type": "Kitchen", "area": 12.0, "perimeter": 14.0},
+    {"name": "Bedroom", "type": "Bedroom", "area": 14.0, "natural_light": True},
+    {"name": "Bathroom", "type": "Bathroom", "area": 6.0},
+    {"name": "Hall", "type": "Corridor", "area": 5.0},
+]
+EDGES = [["Living", "Kitchen"], ["Living", "Hall"], ["Hall", "Bedroom"], ["Hall", "Bathroom"]]
+
+
+def _plan():
+    return build_graph_from_rooms([dict(room) for room in ROOMS], EDGES, footprint=80.0)
+
+
+def _state(graph):
+    rooms = {node: dict(graph.nodes[node].items()) for node in graph.nodes()}
+    return rooms, {frozenset(edge) for edge in graph.edges()}, (graph.total_footprint(), graph.total_wall_length())
+
+
+def _same(state, expected) -> bool:
+    # Totals are running sums, so they only agree with a rebuilt graph to rounding
+    return state[:2] == expected[:2] and state[2] == pytest.approx(expected[2])
+
+
+def _random_edit(rng, graph):
+    """Pick one edit valid for graph; returns (method name, args)."""
+    nodes = sorted(graph.nodes())
+    node = rng.choice(nodes)
+    kind = rng.choice(["area", "perimeter", "tag", "add", "remove"])
+    if kind == "area":
+        return "set_area", (node, round(rng.uniform(3.0, 30.0), 2))
+    if kind == "perimeter":
+        return "set_attr", (node, "perimeter", round(rng.uniform(8.0, 24.0), 2))
+    if kind == "tag":
+        return "set_attr", (node, "natural_light", rng.random() < 0.5)
+    if kind == "remove" and graph.number_of_edges():
+        return "remove", rng.choice(sorted(tuple(sorted(edge)) for edge in graph.edges()))
+    u, v = rng.sample(nodes, 2)
+    return "add", (u, v)
+
+
+def _apply(graph, name, args):
+    if name == "set_area":
+        graph.nodes[args[0]]["area"] = args[1]
+    elif name == "set_attr":
+        graph.nodes[args[0]][args[1]] = args[2]
+    elif name == "add":
+        graph.add_edge(*args)
+    else:
+        graph.remove_edge(*args)
+
+
+def test_commit_and_rollback_match_direct_edits():
+    rng = random.Random(0)
+    for _ in range(200):
+        base, direct = _plan(), _plan()
+        overlay = GraphOverlay(base)
+        before = _state(base)
+        for _ in range(rng.randint(1, 8)):
+            edit = _random_edit(rng, overlay)
+            _apply(overlay, *edit)
+            _apply(direct, *edit)
+
+        # Reads through the overlay see the edits; the base does not
+        assert _same(_state(overlay), _state(direct))
+        assert _same(_state(base), before)
+
+        if rng.random() < 0.5:
+            overlay.rollback()
+            assert _same(_state(base), before)
+            assert _same(_state(overlay), before)
+        else:
+            changed = overlay.commit()
+            assert _same(_state(base), _state(direct))
+            assert _same(_state(overlay), _state(direct))
+            assert changed <= set(base.nodes())
+
+
+def test_failed_commit_changes_nothing():
+    base = _plan()
+    overlay = GraphOverlay(base)
+    overlay.nodes["Kitchen"]["area"] = 15.0
+    overlay.remove_edge("Living", "Hall")
+    base.remove_edge("Living", "Hall")  # base moved on under the overlay
+    before, delta = _state(base), overlay.delta()
+
+    with pytest.raises(KeyError):
+        overlay.commit()
+    assert _same(_state(base), before)
+    assert overlay.delta() == delta
+    assert base.nodes["Kitchen"]["area"] == 12.0
+
+
+def test_invalid_edits_raise():
+    overlay = GraphOverlay(_plan())
+    with pytest.raises(KeyError):
+        overlay.add_edge("Living", "Garage")
+    with pytest.raises(ValueError):
+        overlay.add_edge("Living", "Living")
+    with pytest.raises(KeyError):
+        overlay.remove_edge("Kitchen", "Bedroom")
+    with pytest.raises(KeyError):
+        del overlay.nodes["Living"]["area"]
+    assert overlay.delta() == ({}, set(), set())
+
+
+def test_improver_commit_matches_fresh_score():
+    from training.design_improver import DesignImprover
+
+    improver = DesignImprover()
+    base = _plan()
+    improver.score_design(base)  # warm the cached aggregates the commit patches
+    overlay = improver.propose(base, seed=3)
+    proposed = improver.score_design(overlay)
+    improver.commit(overlay)
+
+    fresh = _plan()
+    for node in fresh.nodes():
+        fresh.nodes[node]["area"] = base.nodes[node]["area"]
+    assert improver.score_design(base) == improver.score_design(fresh) == proposed
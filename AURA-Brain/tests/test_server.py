@@ -0,0 +1,73 @@
+# tests/test_server.py
+# Smoke tests for interface.server routes through Flask's test client.
+# Run:  python -m pytest AURA-Brain/tests  (tests/conftest.py sets the path and working directory)
+
+import json
+
+import pytest
+
+pytest.importorskip("flask")
+
+from interface.server import WorkerPool, create_app
+
+PLAN = {
+    "footprint": 80.0,
+    "rooms": [
+        {"name": "Living", "type": "Living", "area": 14.0},
+        {"name": "Kitchen", "type": "Kitchen", "area": 12.0},
+        {"name": "Bedroom", "type": "Bedroom", "area": 14.0},
+        {"name": "Bathroom", "type": "Bathroom", "area": 6.0},
+    ],
+    "edges": [["Living", "Kitchen"], ["Living", "Bedroom"], ["Bedroom", "Bathroom"]],
+}
+
+
+@pytest.fixture(scope="module")
+def client():
+    pool = WorkerPool(workers=1, max_pending=4, timeout=60)
+    app = create_app(pool)
+    yield app.test_client()
+    pool.shutdown()
+
+
+def test_health(client):
+    response = client.get("/health")
+    assert response.status_code == 200
+    assert response.get_json() == {"status": "ok"}
+
+
+def test_costs(client):
+    response = client.get("/costs")
+    assert response.status_code == 200
+    assert "materials" in response.get_json()
+
+
+def test_analyze(client):
+    response = client.post("/analyze", json=PLAN)
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["status"] == "analyzed"
+    assert {"score", "violations", "suggestions"} <= body.keys()
+
+
+def test_improve(client):
+    response = client.post("/improve", json=PLAN)
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["status"] == "improved"
+    assert len(body["improved_graph"]["rooms"]) == len(PLAN["rooms"])
+
+
+def test_improve_stream(client):
+    response = client.post("/improve/stream?format=jsonl", json=PLAN)
+    assert response.status_code == 200
+    events = [json.loads(line) for line in response.get_data(as_text=True).splitlines() if line]
+    assert events[0]["event"] == "before"
+    assert events[-1]["event"] == "done"
+
+
+@pytest.mark.parametrize("route", ["/analyze", "/improve", "/improve/stream"])
+def test_rejects_invalid_plans(client, route):
+    assert client.post(route, json={"rooms": "Living"}).status_code == 400
+    bad_edge = dict(PLAN, edges=[["Living", "Garage"]])
+    assert client.post(route, json=bad_edge).status_code == 400
@@ -1,95 +1,167 @@
 # training/design_improver.py
 
 import json
+import time
+from typing import Callable, Iterator, Optional
 from learner.graph_builder import RoomGraph
+from learner.graph_overlay import GraphOverlay
 from knowledge.cost_library import get_material_costs
+from knowledge.knowledge_base import KNOWLEDGE_DIR, load_knowledge_base
+from knowledge.room_constraints import load_room_constraints
+from training.scoring_engine import ScoringEngine
+from training.design_search import DesignSearch
 from datetime import datetime
-import random
+import numpy as np
 
-class DesignImprover:
-    def __init__(self, rules_path="knowledge/room_rules.yaml"):
-        self.rules = self.load_rules(rules_path)
-        self.costs = get_material_costs()
 
-    def load_rules(self, path):
-        import yaml
-        with open(path, 'r') as f:
-            return yaml.safe_load(f)
+class SearchCancelled(Exception):
+    """Raised by improve() when its cancelled() callback returns True."""
 
-    def score_design(self, graph: RoomGraph) -> dict:
-        """Evaluate spatial quality and cost."""
-        score = {
-            "circulation": 0,
-            "zoning": 0,
-            "area_efficiency": 0,
-            "material_cost": 0
-        }
 
-        total_area = 0
-        zones = {"private": [], "public": [], "service": []}
-
-        for node in graph.nodes(data=True):
-            room = node[1]
-            total_area += room.get("area", 0)
-            rtype = room.get("type", "")
-            if rtype in self.rules:
-                zones[self.rules[rtype]['zone']].append(room)
-
-        # Simplified heuristics
-        score["area_efficiency"] = min(100, round((total_area / graph.total_footprint()) * 100, 2))
-        score["circulation"] = self.evaluate_circulation(graph)
-        score["zoning"] = self.evaluate_zoning(zones)
-        score["material_cost"] = self.estimate_cost(graph)
-
-        return score
-
-    def evaluate_circulation(self, graph: RoomGraph):
-        """Mock: penalize designs with many disconnected rooms."""
-        disconnected = 0
-        for node in graph.nodes():
-            if graph.degree(node) < 1:
-                disconnected += 1
-        return max(0, 100 - disconnected * 10)
-
-    def evaluate_zoning(self, zones):
-        """Simple zoning quality by adjacency score."""
-        if len(zones["private"]) < 1 or len(zones["service"]) < 1:
-            return 0
-        return 100  # Future: adjacency matrices
+class DesignImprover:
+    def __init__(self, knowledge_dir=KNOWLEDGE_DIR):
+        # Shared read-only snapshot; no YAML parsing per instance
+        kb = load_knowledge_base(knowledge_dir)
+        self.rules = kb.rules
+        self.costs = get_material_costs(knowledge_dir)
+        self.adjacency = kb.adjacency
+        self.engine = ScoringEngine(self.rules, self.costs, self.adjacency)
+        self.search = DesignSearch(self.rules)
+        self.constraints = load_room_constraints(knowledge_dir)
+
+    def score_design(self, graph: RoomGraph) -> dict:
+        """
+        Evaluate spatial quality and cost.
+        Aggregates come from one pass over the rooms and are cached on the graph;
+        improve() keeps them current for the rooms it changes.
+        """
+        return self.engine.score(graph)
+
+    def evaluate_adjacency(self, graph: RoomGraph):
+        """Adjacency quality: mean room-type affinity over the plan's connections (0-100)."""
+        agg = self.engine.aggregates(graph)
+        return self.adjacency.score_ids(agg.edge_src, agg.edge_dst)
+
+    def check_rules(self, graph: RoomGraph) -> list:
+        """room_rules.yaml violations (area bounds, required/avoided neighbours, access, daylight)."""
+        return self.constraints.check(graph)
 
     def estimate_cost(self, graph: RoomGraph):
         """Rough cost estimation using wall lengths and area."""
-        wall_m = graph.total_wall_length()
-        floor_m2 = graph.total_footprint()
-        return round(
-            wall_m * self.costs["cement"] * 0.05 + 
-            floor_m2 * self.costs["tile"] * 0.1 +
-            floor_m2 * self.costs["wood"] * 0.05,
-        2)
-
-    def improve(self, graph: RoomGraph):
-        """Suggest random room tweak (placeholder)."""
+        return self.engine.cost(graph.total_wall_length(), graph.total_footprint())
+
+    def improve(self, graph: RoomGraph, seed=None, cancelled: Optional[Callable[[], bool]] = None):
+        """
+        Resize rooms to the best variant found by a population search (see DesignSearch).
+        The plan is left unchanged if no variant beats it. Same seed, same result.
+        If cancelled() returns True between generations, raises SearchCancelled
+        with the plan untouched.
+        """
+        nodes, rooms, base, types, footprint = self._search_inputs(graph)
+        best = None
+        for best in self.search.iter_search(base, types, footprint, seed=seed):
+            if cancelled is not None and cancelled():
+                raise SearchCancelled()
+        return self._apply(graph, nodes, rooms, best["multipliers"])
+
+    def _search_inputs(self, graph: RoomGraph):
+        nodes, rooms = zip(*graph.nodes(data=True)) if len(graph) else ((), ())
+        base = np.array([room.get("area", 0) for room in rooms], dtype=float)
+        types = [room.get("type", "") for room in rooms]
+        return nodes, rooms, base, types, graph.total_footprint()
+
+    def _apply(self, graph: RoomGraph, nodes, rooms, multipliers):
+        self.engine.aggregates(graph)  # current before the edits, so update() can patch it
         proposals = []
-        for node in graph.nodes(data=True):
-            room = node[1]
-            if random.random() < 0.3:
-                original = room["area"]
-                room["area"] *= round(random.uniform(0.9, 1.1), 2)
-                proposals.append((room["name"], original, room["area"]))
+        changed = []
+        for node, room, factor in zip(nodes, rooms, multipliers):
+            if "area" not in room:
+                continue
+            original = room["area"]
+            area = round(original * float(factor), 2)
+            if area == original:
+                continue  # factor within rounding of 1.0
+            room["area"] = area
+            proposals.append((room.get("name", node), original, area))
+            changed.append(node)
+        self.engine.update(graph, changed)
         return proposals
 
-    def feedback_loop(self, graph: RoomGraph):
+    def propose(self, graph: RoomGraph, seed=None) -> GraphOverlay:
+        """
+        Run improve() on a copy-on-write overlay instead of the plan itself.
+        The base graph is untouched until the caller commits the overlay.
+        """
+        overlay = GraphOverlay(graph)
+        self.improve(overlay, seed=seed)
+        return overlay
+
+    def commit(self, overlay: GraphOverlay) -> set:
+        """
+        Apply a proposal to its base graph, patching the base's cached score
+        aggregates for the changed rooms instead of rebuilding them.
+        """
+        self.engine.aggregates(overlay.base)
+        changed = overlay.commit()
+        self.engine.update(overlay.base, changed, doors_changed=True)
+        return changed
+
+    def feedback_loop(self, graph: RoomGraph, verbose: bool = True, seed=None,
+                      cancelled: Optional[Callable[[], bool]] = None):
         before = self.score_design(graph)
-        print(f"🔍 Before: {json.dumps(before, indent=2)}")
+        if verbose:
+            print(f"🔍 Before: {json.dumps(before, indent=2)}")
 
-        improvements = self.improve(graph)
+        improvements = self.improve(graph, seed=seed, cancelled=cancelled)
 
         after = self.score_design(graph)
-        print(f"✅ After: {json.dumps(after, indent=2)}")
+        if verbose:
+            print(f"✅ After: {json.dumps(after, indent=2)}")
 
         return {
             "before": before,
             "after": after,
             "improvements": improvements,
+            "violations": self.check_rules(graph),
+            "timestamp": datetime.utcnow().isoformat()
+        }
+
+    def feedback_stream(self, graph: RoomGraph, seed=None, interval: float = 0.25,
+                        cancelled: Optional[Callable[[], bool]] = None) -> Iterator[dict]:
+        """
+        feedback_loop() as a sequence of events:
+          {"event": "before", ...}    score and violations, before any search work
+          {"event": "progress", ...}  best areas found so far, at most every `interval` seconds
+          {"event": "after", ...}     the feedback_loop() result
+        With the same seed the final plan matches feedback_loop(). The search
+        stops (and the plan is left unchanged) as soon as cancelled() returns
+        True or the consumer stops iterating.
+        """
+        before = self.score_design(graph)
+        yield {"event": "before", "before": before, "violations": self.check_rules(graph)}
+
+        nodes, rooms, base, types, footprint = self._search_inputs(graph)
+        names = [room.get("name", node) for node, room in zip(nodes, rooms)]
+        best, last = None, time.monotonic()
+        for best in self.search.iter_search(base, types, footprint, seed=seed):
+            if cancelled is not None and cancelled():
+                return
+            now = time.monotonic()
+            if now - last >= interval:
+                last = now
+                yield {
+                    "event": "progress",
+                    "evaluations": best["evaluations"],
+                    "fitness": {"before": round(best["before"], 2), "best": round(best["after"], 2)},
+                    "areas": dict(zip(names, np.round(base * best["multipliers"], 2).tolist())),
+                }
+
+        improvements = self._apply(graph, nodes, rooms, best["multipliers"])
+        yield {
+            "event": "after",
+            "before": before,
+            "after": self.score_design(graph),
+            "improvements": improvements,
+            "violations": self.check_rules(graph),
             "timestamp": datetime.utcnow().isoformat()
         }
@@ -0,0 +1,127 @@
+# training/design_search.py
+
+import time
+from typing import Iterator, Optional
+import numpy as np
+
+
+class DesignSearch:
+    """
+    Population-based search over room areas.
+
+    Each candidate is a vector of per-room area multipliers within
+    [1 - max_change, 1 + max_change]. A generation mutates the best
+    candidates so far with Gaussian noise and scores the whole population
+    as one NumPy batch. The search stops after max_evals candidates or
+    time_budget seconds, whichever comes first, and is reproducible for a
+    given seed.
+
+    Fitness = area efficiency (total room area / footprint, capped at 100)
+    minus a penalty for rooms outside room_rules.yaml min/max areas
+    (relative shortfall or excess, times bounds_weight) minus a penalty for
+    resizing at all (area changed, as a percentage of the footprint, times
+    deviation_weight). The last term is in the same units as efficiency, so
+    with deviation_weight > 1 growing rooms into spare footprint never pays
+    for itself. The final result resets to 1.0 every room whose change does
+    not raise fitness, so rooms that gain nothing keep their exact area.
+    """
+
+    def __init__(self, rules: dict, population: int = 64, elite: int = 8, max_evals: int = 4096,
+                 time_budget: Optional[float] = None, max_change: float = 0.1, sigma: float = 0.03,
+                 bounds_weight: float = 100.0, deviation_weight: float = 1.5, seed: Optional[int] = None):
+        self.definitions = (rules or {}).get("room_definitions", {})
+        self.population = population
+        self.elite = min(elite, population)
+        self.max_evals = max_evals
+        self.time_budget = time_budget
+        self.max_change = max_change
+        self.sigma = sigma
+        self.bounds_weight = bounds_weight
+        self.deviation_weight = deviation_weight
+        self.seed = seed
+
+    def area_bounds(self, room_types):
+        """Per-room min/max area arrays (nan where room_rules.yaml has no bound)."""
+        lo = np.array([self.definitions.get(t, {}).get("min_area_m2", np.nan) for t in room_types], dtype=float)
+        hi = np.array([self.definitions.get(t, {}).get("max_area_m2", np.nan) for t in room_types], dtype=float)
+        return lo, hi
+
+    def fitness(self, multipliers: np.ndarray, base_areas: np.ndarray, footprint: float,
+                lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+        """Vectorized fitness for a (candidates x rooms) matrix of area multipliers."""
+        areas = base_areas[None, :] * multipliers
+        total = areas.sum(axis=1)
+        efficiency = np.minimum(100.0, total / footprint * 100) if footprint else np.zeros(len(areas))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            short = np.where(np.isnan(lo), 0.0, np.maximum(0.0, lo - areas) / lo)
+            over = np.where(np.isnan(hi), 0.0, np.maximum(0.0, areas - hi) / hi)
+        scale = footprint or base_areas.sum()
+        deviation = np.abs(areas - base_areas).sum(axis=1) / scale * 100 if scale else np.zeros(len(areas))
+        return efficiency - self.bounds_weight * (short + over).sum(axis=1) - self.deviation_weight * deviation
+
+    def search(self, base_areas: np.ndarray, room_types, footprint: float, seed: Optional[int] = None) -> dict:
+        """
+        Find the best area multipliers for one plan (seed overrides the instance seed).
+        Returns the multipliers, fitness before/after and the number of evaluations.
+        """
+        result = None
+        for result in self.iter_search(base_areas, room_types, footprint, seed=seed):
+            pass
+        return result
+
+    def iter_search(self, base_areas: np.ndarray, room_types, footprint: float,
+                    seed: Optional[int] = None) -> Iterator[dict]:
+        """
+        search() one generation at a time: yields the unchanged plan, then the
+        best result so far after every generation, then the settled result. Stop iterating to abandon
+        the search; the same seed yields the same sequence.
+        """
+        rng = np.random.default_rng(self.seed if seed is None else seed)
+        lo, hi = self.area_bounds(room_types)
+        n = len(base_areas)
+        low, high = 1 - self.max_change, 1 + self.max_change
+
+        baseline = float(self.fitness(np.ones((1, n)), base_areas, footprint, lo, hi)[0])
+        best = {"multipliers": np.ones(n), "before": baseline, "after": baseline, "evaluations": 1}
+        yield best
+        if n == 0:
+            return
+
+        parents, parent_scores = np.ones((1, n)), np.array([baseline])
+        evals = 1
+        deadline = time.monotonic() + self.time_budget if self.time_budget else None
+        while evals < self.max_evals and (deadline is None or time.monotonic() < deadline):
+            size = min(self.population, self.max_evals - evals)
+            picks = parents[rng.integers(len(parents), size=size)]
+            candidates = np.clip(picks + rng.normal(0.0, self.sigma, size=(size, n)), low, high)
+            scores = self.fitness(candidates, base_areas, footprint, lo, hi)
+            evals += size
+
+            # Elite of parents + children seeds the next generation
+            pool = np.vstack([parents, candidates])
+            pool_scores = np.concatenate([parent_scores, scores])
+            order = np.argsort(pool_scores)[::-1][:self.elite]
+            parents, parent_scores = pool[order], pool_scores[order]
+
+            if parent_scores[0] > baseline:
+                best = {"multipliers": parents[0], "before": baseline, "after": float(parent_scores[0]),
+                        "evaluations": evals}
+            else:
+                best = dict(best, evaluations=evals)
+            yield best
+
+        if best["after"] > baseline:
+            multipliers, score = self._settle(best["multipliers"], base_areas, footprint, lo, hi)
+            yield dict(best, multipliers=multipliers, after=score, evaluations=best["evaluations"] + n)
+
+    def _settle(self, multipliers, base_areas, footprint, lo, hi):
+        """Reset each room's multiplier to 1.0, one at a time, wherever that does not lower fitness."""
+        multipliers = multipliers.copy()
+        score = float(self.fitness(multipliers[None, :], base_areas, footprint, lo, hi)[0])
+        for i in np.flatnonzero(multipliers != 1.0):
+            trial = multipliers.copy()
+            trial[i] = 1.0
+            trial_score = float(self.fitness(trial[None, :], base_areas, footprint, lo, hi)[0])
+            if trial_score >= score:
+                multipliers, score = trial, trial_score
+        return multipliers, score
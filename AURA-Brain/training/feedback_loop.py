@@ -2,52 +2,229 @@
 
 import os
 import json
+import hashlib
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from learner.graph_builder import RoomGraph, build_graph_from_json
+from learner.plan_corpus import PlanCorpus
 from training.design_improver import DesignImprover
+from training.log_sink import FeedbackLogSink
 from datetime import datetime
 
 DATA_DIR = "data/floorplans/"
 LOG_FILE = "logs/feedback_log.jsonl"
+MANIFEST_FILE = "logs/feedback_manifest.jsonl"
+
+# One DesignImprover (and memory-mapped corpus, if any) per pool process, created by _init_worker
+_worker_improver = None
+_worker_corpus = None
+
+
+def _init_worker(corpus_dir=None):
+    global _worker_improver, _worker_corpus
+    _worker_improver = DesignImprover()
+    _worker_corpus = PlanCorpus(corpus_dir) if corpus_dir else None
+
+
+def _process_plan(name: str, raw: bytes) -> dict:
+    """Parse, score and improve one plan inside a pool worker (no printing)."""
+    try:
+        return _improve(name, build_graph_from_json(json.loads(raw)))
+    except Exception as e:  # one malformed plan must not end the run
+        return _failed(name, e)
+
+
+def _process_corpus_plan(p: int) -> dict:
+    """Score and improve plan p of the worker's mapped corpus; only the index crosses processes."""
+    name = _worker_corpus.names[p]
+    try:
+        return _improve(name, _worker_corpus.graph(p))
+    except Exception as e:
+        return _failed(name, e)
+
+
+def _failed(name: str, error: Exception) -> dict:
+    return {"source": name, "error": f"{type(error).__name__}: {error}",
+            "timestamp": datetime.utcnow().isoformat()}
+
+
+def _improve(name: str, graph: RoomGraph) -> dict:
+    result = _worker_improver.feedback_loop(graph, verbose=False)
+    result['source'] = name
+    result['timestamp'] = datetime.utcnow().isoformat()
+    return result
+
 
 class FeedbackLoop:
-    def __init__(self, data_dir=DATA_DIR):
+    def __init__(self, data_dir=DATA_DIR, manifest_file=MANIFEST_FILE, log_file=LOG_FILE,
+                 columnar_dir=None, corpus_dir=None):
+        """
+        corpus_dir points at a packed corpus (learner.plan_corpus) to read
+        instead of parsing the JSON files in data_dir.
+        """
         self.data_dir = data_dir
+        self.corpus_dir = corpus_dir
+        self.manifest_file = manifest_file
         self.improver = DesignImprover()
+        self.failed = 0
+        self.sink = FeedbackLogSink(log_file, columnar_dir=columnar_dir, on_flush=self._mark_flushed)
+
+    def iter_plan_files(self, resume: bool = False):
+        """
+        Lazily yield (file, raw bytes, sha256) for each JSON plan.
+        With resume, files whose content hash is already in the manifest are skipped,
+        so an interrupted run continues where it stopped and unchanged plans are not redone.
+        """
+        done = self.load_manifest() if resume else {}
+        with os.scandir(self.data_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".json"):
+                    continue
+                with open(entry.path, 'rb') as f:
+                    raw = f.read()
+                digest = hashlib.sha256(raw).hexdigest()
+                if done.get(entry.name) == digest:
+                    continue
+                yield entry.name, raw, digest
+
+    def iter_graphs(self, resume: bool = False):
+        """Lazily yield (file, graph, sha256); see iter_plan_files."""
+        if self.corpus_dir:
+            yield from PlanCorpus(self.corpus_dir).iter_graphs(self.load_manifest() if resume else None)
+            return
+        for name, raw, digest in self.iter_plan_files(resume):
+            yield name, build_graph_from_json(json.loads(raw)), digest
 
     def load_graphs(self):
         """Load all JSON graph files from dataset."""
-        graphs = []
-        for file in os.listdir(self.data_dir):
-            if file.endswith(".json"):
-                path = os.path.join(self.data_dir, file)
-                with open(path, 'r') as f:
-                    raw = json.load(f)
-                    graph = build_graph_from_json(raw)
-                    graphs.append((file, graph))
-        return graphs
+        return [(name, graph) for name, graph, _ in self.iter_graphs()]
+
+    def load_manifest(self) -> dict:
+        """Map of file name -> content hash for plans already processed."""
+        done = {}
+        if os.path.exists(self.manifest_file):
+            with open(self.manifest_file, 'r') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # torn last line from a crash
+                    done[record['source']] = record['sha256']
+        return done
+
+    def _mark_flushed(self, records):
+        """
+        Record plans as done once their log records are on disk, so a crash
+        re-runs (and may re-log) unflushed plans rather than losing them.
+        """
+        entries = [r for r in records if 'sha256' in r]
+        if not entries:
+            return
+        os.makedirs(os.path.dirname(self.manifest_file) or ".", exist_ok=True)
+        with open(self.manifest_file, 'a') as f:
+            f.write("".join(json.dumps({"source": r['source'], "sha256": r['sha256']}) + "\n" for r in entries))
 
     def log_result(self, result: dict):
-        """Append result to training log."""
-        os.makedirs("logs", exist_ok=True)
-        with open(LOG_FILE, 'a') as f:
-            f.write(json.dumps(result) + "\n")
+        """Queue result for the training log; written in batches by the sink."""
+        self.sink.write(result)
 
-    def run(self):
-        """Run full feedback loop on dataset."""
-        graphs = self.load_graphs()
-        print(f"🧠 Loaded {len(graphs)} plans for evaluation...")
+    def close(self):
+        """Flush any buffered log records."""
+        self.sink.close()
 
-        for name, graph in graphs:
-            result = self.improver.feedback_loop(graph)
-            result['source'] = name
-            result['timestamp'] = datetime.utcnow().isoformat()
+    def run(self, workers: int = 1, quiet: bool = False, resume: bool = True):
+        """
+        Run full feedback loop on dataset, streaming plans from disk.
+        With workers > 1, plans are scored in a process pool; results come back
+        to this process, which is the only writer of the feedback log.
+        quiet turns off the per-plan prints; resume skips plans already in the manifest.
+        A plan that fails to load or improve is logged as {"source", "error"} and
+        left out of the manifest, so the next resumed run retries it.
+        """
+        print(f"🧠 Streaming plans from {self.corpus_dir or self.data_dir} for evaluation...")
+        self.failed = 0
+        try:
+            if workers > 1:
+                processed = self._run_parallel(workers, quiet, resume)
+            else:
+                processed = self._run_serial(quiet, resume)
+        finally:
+            self.close()
 
+        print(f"🎯 Feedback loop complete. {processed} plans processed ({self.failed} failed). Logs saved.")
+
+    def _run_serial(self, quiet: bool, resume: bool) -> int:
+        corpus = PlanCorpus(self.corpus_dir) if self.corpus_dir else None
+        processed = 0
+        for name, digest, plan in self._iter_pending(resume):
+            try:
+                graph = corpus.graph(plan) if corpus else build_graph_from_json(json.loads(plan))
+                result = self.improver.feedback_loop(graph, verbose=not quiet)
+                result['source'] = name
+                result['timestamp'] = datetime.utcnow().isoformat()
+            except Exception as e:
+                result = _failed(name, e)
+            self._finish(result, digest, quiet)
+            processed += 1
+        return processed
+
+    def _run_parallel(self, workers: int, quiet: bool, resume: bool) -> int:
+        # Bounded window of in-flight plans so the corpus is never fully in memory
+        max_in_flight = workers * 4
+        in_flight = deque()
+        processed = 0
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(self.corpus_dir,)) as pool:
+            for name, digest, plan in self._iter_pending(resume):
+                task = (_process_corpus_plan, plan) if self.corpus_dir else (_process_plan, name, plan)
+                in_flight.append((pool.submit(*task), digest))
+                if len(in_flight) >= max_in_flight:
+                    future, done_digest = in_flight.popleft()
+                    self._finish(future.result(), done_digest, quiet)
+                    processed += 1
+            while in_flight:
+                future, done_digest = in_flight.popleft()
+                self._finish(future.result(), done_digest, quiet)
+                processed += 1
+        return processed
+
+    def _iter_pending(self, resume: bool):
+        """(name, sha256, plan) for each plan to process: plan is a corpus index, or the raw JSON bytes."""
+        if self.corpus_dir:
+            corpus = PlanCorpus(self.corpus_dir)
+            done = self.load_manifest() if resume else {}
+            for p, (name, digest) in enumerate(zip(corpus.names, corpus.hashes)):
+                if done.get(name) != digest:
+                    yield name, digest, p
+        else:
+            for name, raw, digest in self.iter_plan_files(resume):
+                yield name, digest, raw
+
+    def _finish(self, result: dict, digest: str, quiet: bool):
+        if "error" in result:
+            # Logged without a hash, so the manifest doesn't mark the plan done
+            self.failed += 1
             self.log_result(result)
-            print(f"✅ Processed: {name} | Δ Quality: {result['after']['circulation'] - result['before']['circulation']}\n")
+            print(f"❌ {result['source']}: {result['error']}")
+            return
+        result['sha256'] = digest
+        self.log_result(result)
+        if not quiet:
+            self._print_processed(result)
 
-        print("🎯 Feedback loop complete. Logs saved.")
+    def _print_processed(self, result: dict):
+        print(f"✅ Processed: {result['source']} | Δ Quality: {result['after']['circulation'] - result['before']['circulation']}"
+              f" | Rule violations: {len(result.get('violations', []))}\n")
 
 
 if __name__ == "__main__":
-    loop = FeedbackLoop()
-    loop.run()
+    parser = argparse.ArgumentParser(description="Score and improve every plan in the dataset.")
+    parser.add_argument("--workers", type=int, default=1, help="process pool size (1 = run in-process)")
+    parser.add_argument("--quiet", action="store_true", help="suppress per-plan output")
+    parser.add_argument("--corpus", default=None, help="packed corpus directory to read instead of JSON files")
+    parser.add_argument("--no-resume", action="store_true", help="reprocess plans already in the manifest")
+    args = parser.parse_args()
+
+    loop = FeedbackLoop(corpus_dir=args.corpus)
+    loop.run(workers=args.workers, quiet=args.quiet, resume=not args.no_resume)
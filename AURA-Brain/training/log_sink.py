@@ -0,0 +1,111 @@
+# training/log_sink.py
+
+import os
+import json
+import gzip
+import time
+import shutil
+from datetime import datetime
+from typing import Callable, List, Optional
+
+
+class FeedbackLogSink:
+    """
+    Buffered JSONL writer for feedback results.
+
+    Records are held in memory and written in one append when either
+    max_records are pending or flush_interval seconds have passed since the
+    last flush (checked on each write). Once the file reaches max_bytes it is
+    rotated to a timestamped name and, with compress, gzipped.
+    If columnar_dir is set, every flushed batch is also saved there as a
+    compressed .npz of the numeric fields (flattened, e.g. "after.circulation")
+    plus the "source" column, for analytics without JSON parsing.
+    on_flush is called with each batch after it is written.
+    """
+
+    def __init__(self, path: str, max_records: int = 256, flush_interval: float = 5.0,
+                 max_bytes: int = 64 * 1024 * 1024, compress: bool = True,
+                 columnar_dir: Optional[str] = None,
+                 on_flush: Optional[Callable[[List[dict]], None]] = None):
+        self.path = path
+        self.max_records = max_records
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.compress = compress
+        self.columnar_dir = columnar_dir
+        self.on_flush = on_flush
+        self._buffer: List[dict] = []
+        self._last_flush = time.monotonic()
+        self._part = 0
+        if columnar_dir:
+            os.makedirs(columnar_dir, exist_ok=True)
+            self._part = len([f for f in os.listdir(columnar_dir) if f.endswith(".npz")])
+
+    def write(self, record: dict):
+        self._buffer.append(record)
+        if (len(self._buffer) >= self.max_records
+                or time.monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        batch, self._buffer = self._buffer, []
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, 'a') as f:
+            f.write("".join(json.dumps(record) + "\n" for record in batch))
+        if self.columnar_dir:
+            self._write_columns(batch)
+        if self.on_flush:
+            self.on_flush(batch)
+
+        if os.path.getsize(self.path) >= self.max_bytes:
+            self.rotate()
+
+    def rotate(self):
+        """Move the current log aside (gzipped if compress) and start a new file."""
+        if not os.path.exists(self.path):
+            return
+        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+        base, ext = os.path.splitext(self.path)
+        rotated = f"{base}.{stamp}{ext}"
+        os.replace(self.path, rotated)
+        if self.compress:
+            with open(rotated, 'rb') as src, gzip.open(rotated + ".gz", 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(rotated)
+
+    def _write_columns(self, batch: List[dict]):
+        import numpy as np
+
+        rows = [self._flatten(record) for record in batch]
+        keys = sorted({key for row in rows for key in row})
+        columns = {
+            key: np.array([row.get(key, np.nan) for row in rows], dtype=np.float64)
+            for key in keys
+        }
+        columns["source"] = np.array([str(record.get("source", "")) for record in batch])
+        self._part += 1
+        np.savez_compressed(os.path.join(self.columnar_dir, f"part-{self._part:06d}.npz"), **columns)
+
+    @staticmethod
+    def _flatten(record: dict, prefix: str = "") -> dict:
+        flat = {}
+        for key, value in record.items():
+            name = f"{prefix}{key}"
+            if isinstance(value, dict):
+                flat.update(FeedbackLogSink._flatten(value, name + "."))
+            elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                flat[name] = value
+        return flat
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
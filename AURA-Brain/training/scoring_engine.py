@@ -0,0 +1,152 @@
+# training/scoring_engine.py
+
+from typing import Dict, Iterable, Optional
+import numpy as np
+
+CACHE_KEY = "_score_aggregates"
+ZONES = ("private", "public", "service")
+
+
+class ScoreAggregates:
+    """
+    Per-room totals needed by DesignImprover scoring, plus each room's contribution.
+    revision is the graph revision they were computed at. Footprint and wall length
+    are not cached: RoomGraph maintains them and score() reads them live.
+    """
+    __slots__ = ("total_area", "zone_counts", "disconnected", "rooms", "edge_src", "edge_dst", "revision")
+
+    def __init__(self):
+        self.total_area = 0.0
+        self.zone_counts = {zone: 0 for zone in ZONES}
+        self.disconnected = 0
+        self.revision = None
+        # node -> (area, zone or None, disconnected, type, degree)
+        self.rooms: Dict = {}
+        # Affinity-matrix row of each edge end, for the adjacency score
+        self.edge_src = np.zeros(0, dtype=np.intp)
+        self.edge_dst = np.zeros(0, dtype=np.intp)
+
+    def add(self, node, area: float, zone: Optional[str], disconnected: bool, rtype: str, degree: int):
+        self.rooms[node] = (area, zone, disconnected, rtype, degree)
+        self.total_area += area
+        if zone is not None:
+            self.zone_counts[zone] += 1
+        self.disconnected += disconnected
+
+    def remove(self, node):
+        area, zone, disconnected, _, _ = self.rooms.pop(node)
+        self.total_area -= area
+        if zone is not None:
+            self.zone_counts[zone] -= 1
+        self.disconnected -= disconnected
+
+
+class ScoringEngine:
+    """
+    Computes every DesignImprover score aggregate in one pass over the rooms and
+    caches it on the graph (graph.graph[CACHE_KEY]), stamped with graph.revision.
+    Any room or door change bumps the revision, so a stale cache is rebuilt on
+    the next read. A caller that knows which rooms it changed can call update()
+    instead, which re-reads only those rooms: rescoring a tweak is O(changed rooms)
+    plus one call each to total_footprint() / total_wall_length().
+    Graphs without a revision are never cached.
+    """
+
+    def __init__(self, rules: dict, costs: dict, adjacency=None):
+        self.rules = rules
+        self.costs = costs
+        self.adjacency = adjacency
+
+    def _zone_of(self, room: dict) -> Optional[str]:
+        rtype = room.get("type", "")
+        if rtype in self.rules:
+            return self.rules[rtype]['zone']
+        return None
+
+    def _add_room(self, agg: ScoreAggregates, graph, node, room: dict):
+        degree = graph.degree(node)
+        agg.add(node, room.get("area", 0), self._zone_of(room), degree < 1, room.get("type", ""), degree)
+
+    def _index_edges(self, agg: ScoreAggregates, graph):
+        if self.adjacency is None:
+            return
+        types = {node: contrib[3] for node, contrib in agg.rooms.items()}
+        edges = list(graph.edges())
+        agg.edge_src = self.adjacency.type_ids(types[u] for u, _ in edges)
+        agg.edge_dst = self.adjacency.type_ids(types[v] for _, v in edges)
+
+    @staticmethod
+    def _cache(graph) -> Optional[dict]:
+        store = getattr(graph, "graph", None)
+        return store if isinstance(store, dict) else None
+
+    def aggregates(self, graph) -> ScoreAggregates:
+        store = self._cache(graph)
+        revision = getattr(graph, "revision", None)
+        if store is not None and revision is not None:
+            cached = store.get(CACHE_KEY)
+            if cached is not None and cached.revision == revision:
+                return cached
+
+        agg = ScoreAggregates()
+        for node, room in graph.nodes(data=True):
+            self._add_room(agg, graph, node, room)
+        self._index_edges(agg, graph)
+        agg.revision = revision
+
+        if store is not None and revision is not None:
+            store[CACHE_KEY] = agg
+        return agg
+
+    def update(self, graph, nodes: Iterable, doors_changed: bool = False):
+        """
+        Refresh the cached aggregates for rooms that were changed, added or removed.
+        Callers promise that nodes covers every change since the cache was last
+        current; the cache is then re-stamped with the graph's revision.
+        Pass doors_changed when edges were rewired without changing any room's degree.
+        """
+        store = self._cache(graph)
+        if store is None or CACHE_KEY not in store:
+            return
+        agg = store[CACHE_KEY]
+        topology_changed = doors_changed
+        for node in nodes:
+            before = agg.rooms.get(node)
+            if before is not None:
+                agg.remove(node)
+            if node in graph:
+                self._add_room(agg, graph, node, graph.nodes[node])
+            after = agg.rooms.get(node)
+            # Edge type arrays only go stale if a room's type or doors changed
+            if before is None or after is None or before[3:] != after[3:]:
+                topology_changed = True
+        if topology_changed:
+            self._index_edges(agg, graph)
+        agg.revision = getattr(graph, "revision", None)
+
+    def invalidate(self, graph):
+        store = self._cache(graph)
+        if store is not None:
+            store.pop(CACHE_KEY, None)
+
+    def cost(self, wall_m: float, floor_m2: float) -> float:
+        return round(
+            wall_m * self.costs["cement"] * 0.05 +
+            floor_m2 * self.costs["tile"] * 0.1 +
+            floor_m2 * self.costs["wood"] * 0.05,
+        2)
+
+    def score(self, graph) -> dict:
+        agg = self.aggregates(graph)
+        footprint = graph.total_footprint()
+        zoning = 0 if agg.zone_counts["private"] < 1 or agg.zone_counts["service"] < 1 else 100
+        efficiency = (agg.total_area / footprint) * 100 if footprint else 0
+        score = {
+            "circulation": max(0, 100 - agg.disconnected * 10),
+            "zoning": zoning,
+            "area_efficiency": min(100, round(efficiency, 2)),
+            "material_cost": self.cost(graph.total_wall_length(), footprint),
+        }
+        if self.adjacency is not None:
+            score["adjacency"] = self.adjacency.score_ids(agg.edge_src, agg.edge_dst)
+        return score
@@ -1,33 +1,203 @@
 # agents/circulation_agent.py
 # Evaluates and optimizes human flow inside the floor plan
 
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 import networkx as nx
+import numpy as np
+
+# Room types treated as egress points when no exits are given explicitly
+EXIT_TYPES = {"Entrance", "Exit", "Outside"}
 
 class CirculationAgent:
-    def __init__(self, room_graph: nx.Graph):
+    def __init__(self, room_graph: nx.Graph, weight: Optional[str] = None):
         """
         Takes in a room adjacency graph. Nodes are rooms, edges represent connections (doors).
+        If weight names an edge attribute (e.g. "distance" in metres, door to door),
+        path metrics use weighted shortest paths instead of counting doors.
         """
         self.graph = room_graph
+        self.weight = weight
+        self._path_stats: Optional[Dict[str, float]] = None
+        self._dist: Optional[np.ndarray] = None
+        self._index: Dict = {}
+
+    def distance_matrix(self) -> np.ndarray:
+        """
+        All-pairs shortest path lengths (np.inf where unreachable), built from one
+        BFS (or Dijkstra, in weighted mode) traversal per source room and kept up to date by add_door/remove_door.
+        Rows and columns follow the order of self.graph.nodes.
+        """
+        if self._dist is None:
+            nodes = list(self.graph.nodes)
+            self._index = {node: i for i, node in enumerate(nodes)}
+            dist = np.full((len(nodes), len(nodes)), np.inf)
+            for i, source in enumerate(nodes):
+                self._fill_row(dist, i, source)
+            self._dist = dist
+        return self._dist
+
+    def _fill_row(self, dist: np.ndarray, i: int, source) -> None:
+        dist[i] = np.inf
+        if self.weight is None:
+            lengths = nx.single_source_shortest_path_length(self.graph, source)
+        else:
+            lengths = nx.single_source_dijkstra_path_length(self.graph, source, weight=self.weight)
+        for target, length in lengths.items():
+            dist[i, self._index[target]] = length
+
+    @staticmethod
+    def _stats_from_matrix(dist: np.ndarray) -> Dict[str, float]:
+        n = len(dist)
+        finite = np.isfinite(dist)
+        # The zero diagonal is always finite but is not a room pair
+        reachable = int(finite.sum()) - n
+        total_length = float(dist[finite].sum())
+        return {
+            "total_path_length": total_length,
+            "reachable_pairs": reachable,
+            "unreachable_pairs": n * (n - 1) - reachable,
+            "mean_path_length": total_length / reachable if reachable else 999.0,
+        }
+
+    def compute_path_stats(self) -> Dict[str, float]:
+        """
+        All-pairs circulation metrics from the shared distance matrix.
+        Mean path length and unreachable pair count are computed together and
+        cached, so repeated queries (and suggest_improvements) don't re-traverse.
+        Call refresh() after mutating the graph outside add_door/remove_door.
+        """
+        if self._path_stats is None:
+            self._path_stats = self._stats_from_matrix(self.distance_matrix())
+        return self._path_stats
+
+    def refresh(self) -> None:
+        """
+        Drop cached path metrics after the room graph has been modified.
+        """
+        self._path_stats = None
+        self._dist = None
+        self._index = {}
+
+    def _relaxed_with_door(self, u, v, length: float = 1.0) -> np.ndarray:
+        """
+        Distance matrix after adding door u-v: every pair can now route through it,
+        so one O(N²) vectorized relaxation replaces a full recomputation.
+        """
+        dist = self.distance_matrix()
+        iu, iv = self._index[u], self._index[v]
+        via_uv = dist[:, iu, None] + length + dist[None, iv, :]
+        via_vu = dist[:, iv, None] + length + dist[None, iu, :]
+        return np.minimum(dist, np.minimum(via_uv, via_vu))
+
+    def _edge_length(self, u, v) -> float:
+        if self.weight is None:
+            return 1.0
+        return self.graph[u][v].get(self.weight, 1.0)
+
+    def evaluate_door(self, u, v, length: float = 1.0) -> Dict[str, float]:
+        """
+        What-if: path metrics if a door between u and v were added. The graph is not changed.
+        length is the door-to-door distance in weighted mode and is ignored otherwise.
+        """
+        if self.weight is None:
+            length = 1.0
+        before = self.compute_path_stats()
+        after = self._stats_from_matrix(self._relaxed_with_door(u, v, length))
+        return {
+            "door": (u, v),
+            "mean_path_length": after["mean_path_length"],
+            "mean_path_gain": before["mean_path_length"] - after["mean_path_length"],
+            "pairs_connected": before["unreachable_pairs"] - after["unreachable_pairs"],
+        }
+
+    def rank_candidate_doors(self, candidates: List[Tuple], top_k: Optional[int] = None) -> List[Dict]:
+        """
+        Rank candidate doors (pairs of existing rooms, or (u, v, length) in weighted mode), best first.
+        Doors that connect otherwise unreachable rooms rank above pure shortcuts;
+        ties are broken by mean path length reduction.
+        """
+        results = [self.evaluate_door(*door) for door in candidates]
+        results.sort(key=lambda r: (r["pairs_connected"], r["mean_path_gain"]), reverse=True)
+        return results[:top_k] if top_k is not None else results
+
+    def add_door(self, u, v, length: float = 1.0) -> None:
+        """
+        Add a door and update the distance matrix incrementally.
+        """
+        if self.weight is None:
+            length = 1.0
+        attrs = {} if self.weight is None else {self.weight: length}
+        if self._dist is None or u not in self._index or v not in self._index:
+            self.graph.add_edge(u, v, **attrs)
+            self.refresh()
+            return
+        if self.graph.has_edge(u, v):
+            # Replacing an existing door may lengthen paths, so it cannot be relaxed
+            self.remove_door(u, v)
+        self._dist = self._relaxed_with_door(u, v, length)
+        self.graph.add_edge(u, v, **attrs)
+        self._path_stats = None
+
+    def remove_door(self, u, v) -> None:
+        """
+        Remove a door and re-run BFS only from rooms whose shortest paths used it.
+        """
+        length = self._edge_length(u, v)
+        self.graph.remove_edge(u, v)
+        if self._dist is None:
+            return
+        dist = self._dist
+        iu, iv = self._index[u], self._index[v]
+        # The door lies on a shortest path from s only if it is tight: |d(s,u) - d(s,v)| == length
+        with np.errstate(invalid="ignore"):
+            affected = np.flatnonzero(np.isclose(np.abs(dist[:, iu] - dist[:, iv]), length))
+        nodes = list(self._index)
+        for i in affected:
+            self._fill_row(dist, i, nodes[i])
+            dist[:, i] = dist[i]
+        self._path_stats = None
 
     def compute_flow_efficiency(self) -> float:
         """
         Uses shortest path averages to evaluate how navigable the floor plan is.
         Lower values = more efficient circulation.
         """
-        all_lengths = []
-        for source in self.graph.nodes:
-            for target in self.graph.nodes:
-                if source != target:
-                    try:
-                        length = nx.shortest_path_length(self.graph, source=source, target=target)
-                        all_lengths.append(length)
-                    except nx.NetworkXNoPath:
-                        continue
-        if not all_lengths:
-            return 999.0  # Very poor
-        return sum(all_lengths) / len(all_lengths)
+        return self.compute_path_stats()["mean_path_length"]
+
+    def find_exits(self) -> List:
+        """
+        Rooms flagged with exit=True or typed as an entrance/exit.
+        """
+        return [
+            node for node, data in self.graph.nodes(data=True)
+            if data.get("exit") or data.get("type") in EXIT_TYPES or node in EXIT_TYPES
+        ]
+
+    def compute_egress_distances(self, exits: Optional[List] = None,
+                                 internal_attr: str = "internal_travel") -> Dict:
+        """
+        Worst-case travel distance from each room to its nearest exit.
+        One multi-source Dijkstra from all exits covers every room in a single pass.
+        The optional internal_attr node attribute adds the furthest in-room travel
+        to the room's door. Rooms with no route to an exit get inf.
+        """
+        exits = self.find_exits() if exits is None else exits
+        weight = self.weight or (lambda u, v, d: 1)
+        to_exit = nx.multi_source_dijkstra_path_length(self.graph, set(exits), weight=weight) if exits else {}
+        return {
+            node: to_exit.get(node, float("inf")) + data.get(internal_attr, 0)
+            for node, data in self.graph.nodes(data=True)
+        }
+
+    def flag_egress_violations(self, max_distance: float, exits: Optional[List] = None) -> Dict:
+        """
+        Rooms whose worst-case egress distance exceeds max_distance.
+        """
+        return {
+            node: dist
+            for node, dist in self.compute_egress_distances(exits).items()
+            if dist > max_distance
+        }
 
     def detect_dead_ends(self) -> List[str]:
         """
@@ -35,17 +205,34 @@ class CirculationAgent:
         """
         return [node for node in self.graph.nodes if self.graph.degree[node] == 1]
 
-    def suggest_improvements(self) -> List[str]:
+    def suggest_improvements(self, candidate_doors: Optional[List[Tuple]] = None,
+                             max_egress: Optional[float] = None) -> List[str]:
         """
         Returns improvement suggestions based on circulation inefficiencies.
+        If candidate_doors are given, the most effective one is suggested as well;
+        if max_egress is given, rooms too far from an exit are reported.
         """
         suggestions = []
-        eff = self.compute_flow_efficiency()
-        if eff > 2.5:
+        stats = self.compute_path_stats()
+        if stats["mean_path_length"] > 2.5:
             suggestions.append("🔁 Consider open plan to improve movement.")
+        if stats["unreachable_pairs"]:
+            suggestions.append(f"⛔ {stats['unreachable_pairs']} room pairs have no connecting route.")
         deads = self.detect_dead_ends()
         if deads:
             suggestions.append(f"🚪 Add secondary access to: {', '.join(deads)}")
+        if max_egress is not None:
+            too_far = self.flag_egress_violations(max_egress)
+            if too_far:
+                suggestions.append(f"🏃 Egress distance over {max_egress}: {', '.join(map(str, too_far))}")
+        if candidate_doors:
+            best = self.rank_candidate_doors(candidate_doors, top_k=1)[0]
+            if best["pairs_connected"] or best["mean_path_gain"] > 0:
+                u, v = best["door"]
+                suggestions.append(
+                    f"➕ Best new door: {u} ↔ {v} "
+                    f"(mean path {stats['mean_path_length']:.2f} → {best['mean_path_length']:.2f})"
+                )
         return suggestions
 
 
@@ -63,3 +250,13 @@ if __name__ == "__main__":
     print("Efficiency Score:", agent.compute_flow_efficiency())
     print("Dead Ends:", agent.detect_dead_ends())
     print("Suggestions:", agent.suggest_improvements())
+    W = nx.Graph()
+    W.add_edge("Entrance", "Living Room", distance=3.0)
+    W.add_edge("Living Room", "Dining", distance=5.5)
+    W.add_edge("Dining", "Kitchen", distance=4.0)
+    W.add_edge("Living Room", "Bedroom", distance=8.0)
+    W.add_edge("Bedroom", "Toilet", distance=3.5)
+    egress = CirculationAgent(W, weight="distance")
+    print("Egress Distances:", egress.compute_egress_distances())
+    print("Egress Violations (> 12 m):", egress.flag_egress_violations(12.0))
+    print("Door Ranking:", agent.rank_candidate_doors([("Kitchen", "Toilet"), ("Dining", "Bedroom")]))
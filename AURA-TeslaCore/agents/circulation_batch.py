@@ -0,0 +1,263 @@
+# agents/circulation_batch.py
+# Scores circulation for many room graphs at once using packed CSR / NumPy arrays
+
+from typing import Dict, Iterable, List
+import networkx as nx
+import numpy as np
+
+# Plans up to this many rooms use padded dense BFS (batched matmuls); larger
+# ones use a frontier BFS straight on the CSR arrays, which is O(rooms · doors)
+# per plan instead of O(rooms³) per BFS level.
+DENSE_MAX_ROOMS = 32
+
+
+class CirculationBatch:
+    def __init__(self, node_offsets: np.ndarray, indptr: np.ndarray, indices: np.ndarray,
+                 node_names: List[str]):
+        """
+        Many room graphs packed into one block-diagonal CSR adjacency.
+        Rooms of graph g are global nodes node_offsets[g]:node_offsets[g + 1];
+        neighbours of node i are indices[indptr[i]:indptr[i + 1]].
+        """
+        self.node_offsets = node_offsets
+        self.indptr = indptr
+        self.indices = indices
+        self.node_names = node_names
+
+    @classmethod
+    def from_graphs(cls, graphs: Iterable[nx.Graph]) -> "CirculationBatch":
+        """
+        Pack NetworkX room graphs into compact int32 arrays.
+        Every door is stored in both directions, so a self-loop appears twice
+        and adds 2 to its room's degree, as in NetworkX (and CirculationAgent).
+        Shortest paths are unaffected: a room is always reached from itself.
+        """
+        node_offsets = [0]
+        node_names: List[str] = []
+        src: List[int] = []
+        dst: List[int] = []
+        for graph in graphs:
+            base = node_offsets[-1]
+            index = {node: base + i for i, node in enumerate(graph.nodes)}
+            node_names.extend(str(node) for node in graph.nodes)
+            for u, v in graph.edges():
+                src += (index[u], index[v])
+                dst += (index[v], index[u])
+            node_offsets.append(base + len(index))
+
+        n_nodes = node_offsets[-1]
+        src_arr = np.asarray(src, dtype=np.int32)
+        dst_arr = np.asarray(dst, dtype=np.int32)
+        order = np.argsort(src_arr, kind="stable")
+        indptr = np.zeros(n_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src_arr, minlength=n_nodes), out=indptr[1:])
+        return cls(np.asarray(node_offsets, dtype=np.int64), indptr, dst_arr[order], node_names)
+
+    @property
+    def num_graphs(self) -> int:
+        return len(self.node_offsets) - 1
+
+    def graph_sizes(self) -> np.ndarray:
+        return np.diff(self.node_offsets)
+
+    def degrees(self) -> np.ndarray:
+        """
+        Degree of every packed node (self-loops count twice, as in NetworkX).
+        """
+        return np.diff(self.indptr)
+
+    def _node_graph_ids(self) -> np.ndarray:
+        return np.repeat(np.arange(self.num_graphs), self.graph_sizes())
+
+    def degree_stats(self) -> Dict[str, np.ndarray]:
+        """
+        Per-graph min / max / mean degree and dead-end count.
+        """
+        deg = self.degrees()
+        sizes = self.graph_sizes()
+        nonempty = sizes > 0
+        starts = self.node_offsets[:-1][nonempty]
+        stats = {
+            "min_degree": np.zeros(self.num_graphs, dtype=np.int64),
+            "max_degree": np.zeros(self.num_graphs, dtype=np.int64),
+            "mean_degree": np.zeros(self.num_graphs),
+            "dead_end_count": np.bincount(self._node_graph_ids(), weights=deg == 1,
+                                          minlength=self.num_graphs).astype(np.int64),
+        }
+        if len(starts):
+            stats["min_degree"][nonempty] = np.minimum.reduceat(deg, starts)
+            stats["max_degree"][nonempty] = np.maximum.reduceat(deg, starts)
+            stats["mean_degree"][nonempty] = np.add.reduceat(deg, starts) / sizes[nonempty]
+        return stats
+
+    def dead_ends(self) -> List[List[str]]:
+        """
+        Rooms with only one connection, grouped per graph.
+        """
+        if self.num_graphs == 0:
+            return []
+        dead = np.flatnonzero(self.degrees() == 1)
+        split_at = np.searchsorted(dead, self.node_offsets[1:-1])
+        return [[self.node_names[i] for i in group] for group in np.split(dead, split_at)]
+
+    def _path_totals(self, graph_ids: np.ndarray, size: int, edge_src: np.ndarray,
+                     edge_gid: np.ndarray):
+        """
+        Level-synchronous BFS from every source of every graph in the bucket at once,
+        using batched boolean matrix products on a padded dense adjacency.
+        """
+        b = len(graph_ids)
+        adj = np.zeros((b, size, size), dtype=np.float32)
+
+        local_pos = np.full(self.num_graphs, -1, dtype=np.int64)
+        local_pos[graph_ids] = np.arange(b)
+        keep = local_pos[edge_gid] >= 0
+        rows = local_pos[edge_gid[keep]]
+        starts = self.node_offsets[edge_gid[keep]]
+        adj[rows, edge_src[keep] - starts, self.indices[keep] - starts] = 1.0
+
+        sizes = self.graph_sizes()[graph_ids]
+        valid = np.arange(size)[None, :] < sizes[:, None]
+        reach = np.zeros((b, size, size), dtype=bool)
+        reach[:, np.arange(size), np.arange(size)] = valid
+        frontier = reach.copy()
+
+        total = np.zeros(b)
+        pairs = np.zeros(b, dtype=np.int64)
+        for level in range(1, size):
+            nxt = (np.matmul(frontier.astype(np.float32), adj) > 0) & ~reach
+            counts = nxt.sum(axis=(1, 2))
+            if not counts.any():
+                break
+            total += level * counts
+            pairs += counts
+            reach |= nxt
+            frontier = nxt
+        return total, pairs
+
+    def _frontier_path_totals(self, graph_ids: np.ndarray):
+        """
+        BFS from every room of every graph in graph_ids at once, directly on the
+        CSR arrays. The frontier is a list of (source, room) pairs; each level
+        gathers the rooms' neighbour ranges, drops pairs already visited (one
+        flat bitmap of sum(size²) cells) and counts the new pairs per graph.
+        """
+        sizes = self.graph_sizes()[graph_ids]
+        offsets = self.node_offsets[graph_ids]
+        cell_base = np.concatenate([[0], np.cumsum(sizes * sizes)[:-1]])
+        # Per packed node: its graph's position in graph_ids (-1 if not selected)
+        local = np.full(self.num_graphs, -1, dtype=np.int64)
+        local[graph_ids] = np.arange(len(graph_ids))
+        node_local = local[self._node_graph_ids()]
+
+        src = np.concatenate([np.arange(o, o + n) for o, n in zip(offsets, sizes)]).astype(np.int64)
+        room = src.copy()
+        visited = np.zeros(int((sizes * sizes).sum()), dtype=bool)
+
+        def cells(s, r):
+            g = node_local[s]
+            return cell_base[g] + (s - offsets[g]) * sizes[g] + (r - offsets[g])
+
+        visited[cells(src, room)] = True
+        total = np.zeros(len(graph_ids))
+        pairs = np.zeros(len(graph_ids), dtype=np.int64)
+        level = 0
+        while len(src):
+            level += 1
+            starts, deg = self.indptr[room], self.indptr[room + 1] - self.indptr[room]
+            src = np.repeat(src, deg)
+            # Position k of the expanded list reads indices[starts[j] + (k - first[j])]
+            first = np.cumsum(deg) - deg
+            room = self.indices[np.repeat(starts - first, deg) + np.arange(int(deg.sum()))].astype(np.int64)
+            keys = cells(src, room)
+            fresh = ~visited[keys]
+            keys, keep = np.unique(keys[fresh], return_index=True)
+            src, room = src[fresh][keep], room[fresh][keep]
+            visited[keys] = True
+            counts = np.bincount(node_local[src], minlength=len(graph_ids))
+            total += level * counts
+            pairs += counts
+        return total, pairs
+
+    def flow_efficiency(self, max_cells: int = 4_000_000) -> np.ndarray:
+        """
+        Mean shortest path length per graph (999.0 when no room pair connects),
+        matching CirculationAgent.compute_flow_efficiency.
+        Small graphs are bucketed by room count for dense BFS, so padding stays
+        small; larger ones go through the CSR frontier BFS. max_cells caps the
+        dense working set, or the visited bitmap, of each chunk.
+        """
+        sizes = self.graph_sizes()
+        deg = self.degrees()
+        edge_src = np.repeat(np.arange(len(deg)), deg)
+        edge_gid = self._node_graph_ids()[edge_src]
+        total = np.zeros(self.num_graphs)
+        pairs = np.zeros(self.num_graphs, dtype=np.int64)
+        for size in np.unique(sizes[(sizes >= 2) & (sizes <= DENSE_MAX_ROOMS)]):
+            ids = np.flatnonzero(sizes == size)
+            chunk = max(1, max_cells // int(size * size))
+            for i in range(0, len(ids), chunk):
+                part = ids[i:i + chunk]
+                total[part], pairs[part] = self._path_totals(part, int(size), edge_src, edge_gid)
+
+        large = np.flatnonzero(sizes > DENSE_MAX_ROOMS)
+        start = 0
+        while start < len(large):
+            # As many graphs as fit their visited bitmaps in max_cells (always at least one)
+            stop, cells = start + 1, int(sizes[large[start]]) ** 2
+            while stop < len(large) and cells + int(sizes[large[stop]]) ** 2 <= max_cells:
+                cells += int(sizes[large[stop]]) ** 2
+                stop += 1
+            part = large[start:stop]
+            total[part], pairs[part] = self._frontier_path_totals(part)
+            start = stop
+
+        eff = np.full(self.num_graphs, 999.0)
+        np.divide(total, pairs, out=eff, where=pairs > 0)
+        return eff
+
+    def score(self) -> List[Dict]:
+        """
+        Flow efficiency, dead ends and degree statistics for every packed graph.
+        """
+        eff = self.flow_efficiency()
+        stats = self.degree_stats()
+        deads = self.dead_ends()
+        return [
+            {
+                "flow_efficiency": float(eff[g]),
+                "dead_ends": deads[g],
+                "min_degree": int(stats["min_degree"][g]),
+                "max_degree": int(stats["max_degree"][g]),
+                "mean_degree": float(stats["mean_degree"][g]),
+            }
+            for g in range(self.num_graphs)
+        ]
+
+
+def score_circulation_batch(graphs: Iterable[nx.Graph]) -> List[Dict]:
+    """
+    Batch counterpart to building one CirculationAgent per plan.
+    """
+    return CirculationBatch.from_graphs(graphs).score()
+
+
+# Example usage:
+if __name__ == "__main__":
+    G1 = nx.Graph()
+    G1.add_edges_from([
+        ("Living Room", "Dining"),
+        ("Dining", "Kitchen"),
+        ("Living Room", "Bedroom"),
+        ("Bedroom", "Toilet"),
+    ])
+    G2 = nx.Graph()
+    G2.add_edges_from([
+        ("Living Room", "Kitchen"),
+        ("Living Room", "Bedroom"),
+        ("Kitchen", "Bedroom"),
+    ])
+    G2.add_node("Store")
+
+    for i, result in enumerate(score_circulation_batch([G1, G2])):
+        print(f"Plan {i}:", result)
@@ -0,0 +1,43 @@
+# agents/test_circulation_agent.py
+# Fuzz test: add_door / remove_door keep the incremental distance matrix equal to a full recomputation.
+
+import random
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from agents.circulation_agent import CirculationAgent
+
+
+def _random_plan(rng: random.Random, weighted: bool) -> nx.Graph:
+    graph = nx.gnp_random_graph(rng.randint(2, 12), rng.uniform(0.1, 0.5), seed=rng.randrange(1 << 30))
+    if weighted:
+        # Small integer lengths make equal-length alternative routes (ties) common
+        for u, v in graph.edges():
+            graph[u][v]["distance"] = float(rng.randint(1, 4))
+    return graph
+
+
+def _brute_force(graph: nx.Graph, weight) -> np.ndarray:
+    return CirculationAgent(graph.copy(), weight=weight).distance_matrix()
+
+
+@pytest.mark.parametrize("weighted", [False, True])
+def test_incremental_doors_match_brute_force(weighted):
+    rng = random.Random(7 if weighted else 3)
+    weight = "distance" if weighted else None
+    for _ in range(200):
+        graph = _random_plan(rng, weighted)
+        agent = CirculationAgent(graph, weight=weight)
+        agent.distance_matrix()
+        nodes = list(graph.nodes)
+        for _ in range(6):
+            edges = list(graph.edges())
+            if edges and rng.random() < 0.5:
+                agent.remove_door(*rng.choice(edges))
+            else:
+                u, v = rng.sample(nodes, 2)
+                agent.add_door(u, v, float(rng.randint(1, 4)))
+            np.testing.assert_array_equal(agent.distance_matrix(), _brute_force(graph, weight))
+            assert agent.compute_path_stats() == CirculationAgent(graph.copy(), weight=weight).compute_path_stats()
@@ -1,7 +1,84 @@
 # agents/zoning_agent.py 
 # Enforces zoning laws, land use rules, height, FAR, setbacks, site shape constraints
 
-from typing import Dict, List, Optional
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+import numpy as np
+
+# Violation codes for batch validation; bit flags, OR-ed together per plan
+FAR_EXCEEDED = 1
+SETBACK_TOO_SMALL = 2
+HEIGHT_EXCEEDED = 4
+LAND_USE_NOT_PERMITTED = 8
+
+
+def _far_message(far: float, max_far: float) -> str:
+    return f"FAR exceeded: {far:.2f} > allowed {max_far}"
+
+def _setback_message(edge: str, value, dist: float) -> str:
+    return f"{edge} setback too small: {value} < {dist}"
+
+def _height_message(height: float, max_height: float) -> str:
+    return f"Height limit exceeded: {height} > {max_height}"
+
+def _land_use_message(program: str) -> str:
+    return f"Land use '{program}' not permitted in zone."
+
+
+class ZoningBatchResult:
+    def __init__(self, far: np.ndarray, height: np.ndarray, program: np.ndarray,
+                 setbacks: Dict[str, np.ndarray], rules: Dict):
+        """
+        Vectorized outcome of ZoningAgent.validate_batch. Per-check masks are True
+        where a plan passes; codes holds the OR-ed violation flags per plan.
+        Messages are only formatted on request via violations(i).
+        """
+        self.rules = rules
+        self.far = far
+        self.height = height
+        self.program = program
+        self.setbacks = setbacks
+
+        self.far_ok = far <= rules['far']
+        self.height_ok = height <= rules['height_limit']
+        self.land_use_ok = np.isin(program, list(rules['allowed_uses']))
+        self.setback_ok = {edge: setbacks[edge] >= dist for edge, dist in rules['setbacks'].items()}
+        all_setbacks_ok = np.logical_and.reduce(list(self.setback_ok.values()) or [np.ones_like(self.far_ok)])
+
+        self.codes = (
+            np.where(self.far_ok, 0, FAR_EXCEEDED)
+            | np.where(all_setbacks_ok, 0, SETBACK_TOO_SMALL)
+            | np.where(self.height_ok, 0, HEIGHT_EXCEEDED)
+            | np.where(self.land_use_ok, 0, LAND_USE_NOT_PERMITTED)
+        ).astype(np.uint8)
+        self.passed = self.codes == 0
+
+    def failed_indices(self) -> np.ndarray:
+        return np.flatnonzero(~self.passed)
+
+    def violations(self, i: int) -> List[str]:
+        """
+        Human-readable violations for plan i, same wording as ZoningAgent.validate.
+        """
+        messages = []
+        if not self.far_ok[i]:
+            messages.append(_far_message(self.far[i], self.rules['far']))
+        for edge, dist in self.rules['setbacks'].items():
+            if not self.setback_ok[edge][i]:
+                messages.append(_setback_message(edge, self.setbacks[edge][i], dist))
+        if not self.height_ok[i]:
+            messages.append(_height_message(self.height[i], self.rules['height_limit']))
+        if not self.land_use_ok[i]:
+            messages.append(_land_use_message(self.program[i]))
+        return messages
+
+
+class ZoningResult(NamedTuple):
+    """
+    Immutable outcome of ZoningAgent.evaluate; safe to hand across threads.
+    """
+    passed: bool
+    violations: Tuple[str, ...]
+
 
 class ZoningAgent:
     def __init__(self, site_data: Dict, zoning_rules: Dict):
@@ -9,42 +86,64 @@ class ZoningAgent:
         self.rules = zoning_rules
         self.violations = []
 
-    def check_far(self, built_up_area: float) -> bool:
+    # Pure checks: return violation messages and never touch agent state
+
+    def far_violations(self, built_up_area: float) -> List[str]:
         """
         FAR (Floor Area Ratio) = Total built-up area / Site area
         """
-        site_area = self.site_data['area']
         max_far = self.rules['far']
-        far = built_up_area / site_area
-        if far > max_far:
-            self.violations.append(f"FAR exceeded: {far:.2f} > allowed {max_far}")
-            return False
-        return True
+        far = built_up_area / self.site_data['area']
+        return [_far_message(far, max_far)] if far > max_far else []
 
-    def check_setbacks(self, footprint: Dict[str, float]) -> bool:
+    def setback_violations(self, footprint: Dict[str, float]) -> List[str]:
         """
         Check if the building footprint respects required setbacks (front, rear, side)
         """
-        result = True
-        for edge, dist in self.rules['setbacks'].items():
-            if footprint.get(edge, 0) < dist:
-                self.violations.append(f"{edge} setback too small: {footprint.get(edge)} < {dist}")
-                result = False
-        return result
+        return [
+            _setback_message(edge, footprint.get(edge), dist)
+            for edge, dist in self.rules['setbacks'].items()
+            if footprint.get(edge, 0) < dist
+        ]
 
-    def check_height(self, proposed_height: float) -> bool:
+    def height_violations(self, proposed_height: float) -> List[str]:
         max_height = self.rules['height_limit']
-        if proposed_height > max_height:
-            self.violations.append(f"Height limit exceeded: {proposed_height} > {max_height}")
-            return False
-        return True
+        return [_height_message(proposed_height, max_height)] if proposed_height > max_height else []
+
+    def land_use_violations(self, program: str) -> List[str]:
+        return [] if program in self.rules['allowed_uses'] else [_land_use_message(program)]
+
+    def evaluate(self, plan_summary: Dict) -> ZoningResult:
+        """
+        Stateless counterpart to validate(): runs all checks and returns the
+        violations in an immutable result, so one agent per rule set can be
+        shared between threads or concurrent requests without locking.
+        """
+        violations = tuple(
+            self.far_violations(plan_summary['built_up_area'])
+            + self.setback_violations(plan_summary['footprint'])
+            + self.height_violations(plan_summary['height'])
+            + self.land_use_violations(plan_summary['program'])
+        )
+        return ZoningResult(passed=not violations, violations=violations)
+
+    # Stateful checks: record violations on self.violations
+
+    def _record(self, found: List[str]) -> bool:
+        self.violations.extend(found)
+        return not found
+
+    def check_far(self, built_up_area: float) -> bool:
+        return self._record(self.far_violations(built_up_area))
+
+    def check_setbacks(self, footprint: Dict[str, float]) -> bool:
+        return self._record(self.setback_violations(footprint))
+
+    def check_height(self, proposed_height: float) -> bool:
+        return self._record(self.height_violations(proposed_height))
 
     def check_land_use(self, program: str) -> bool:
-        allowed = self.rules['allowed_uses']
-        if program not in allowed:
-            self.violations.append(f"Land use '{program}' not permitted in zone.")
-            return False
-        return True
+        return self._record(self.land_use_violations(program))
 
     def validate(self, plan_summary: Dict) -> bool:
         """
@@ -55,19 +154,38 @@ class ZoningAgent:
             'height': 9.5,
             'program': 'residential'
         }
+        Violations are stored on the agent; use evaluate() when sharing an agent.
         """
+        result = self.evaluate(plan_summary)
         self.violations.clear()
-        checks = [
-            self.check_far(plan_summary['built_up_area']),
-            self.check_setbacks(plan_summary['footprint']),
-            self.check_height(plan_summary['height']),
-            self.check_land_use(plan_summary['program'])
-        ]
-        return all(checks)
+        self.violations.extend(result.violations)
+        return result.passed
 
     def get_violations(self) -> List[str]:
         return self.violations
 
+    def validate_batch(self, built_up_area: Sequence[float], height: Sequence[float],
+                       program: Sequence[str], setbacks: Dict[str, Sequence[float]]) -> ZoningBatchResult:
+        """
+        Validate many candidate plans for this site at once from columnar arrays.
+        setbacks maps each edge ('front', 'rear', ...) to an array of distances;
+        a missing edge counts as 0, as in check_setbacks.
+        Does not touch self.violations.
+        """
+        built_up_area = np.asarray(built_up_area, dtype=float)
+        n = len(built_up_area)
+        columns = {
+            edge: np.asarray(setbacks[edge], dtype=float) if edge in setbacks else np.zeros(n)
+            for edge in self.rules['setbacks']
+        }
+        return ZoningBatchResult(
+            far=built_up_area / self.site_data['area'],
+            height=np.asarray(height, dtype=float),
+            program=np.asarray(program),
+            setbacks=columns,
+            rules=self.rules,
+        )
+
 
 # Example usage
 if __name__ == "__main__":
@@ -98,3 +216,18 @@ if __name__ == "__main__":
         print("❌ Zoning validation failed:")
         for v in agent.get_violations():
             print(" -", v)
+
+    # Stateless path: one shared agent, an immutable result per request
+    result = agent.evaluate({**sample_plan, 'height': 9.0, 'footprint': rules['setbacks']})
+    print("Shared-agent evaluate:", result)
+
+    # Sweep massing variants against the same site
+    batch = agent.validate_batch(
+        built_up_area=[600.0, 700.0, 800.0],
+        height=[9.0, 9.5, 12.0],
+        program=['residential', 'office', 'industrial'],
+        setbacks={'front': [5.0, 5.5, 4.0], 'rear': [3.0, 3.0, 3.0], 'left': [2.5, 2.5, 2.5], 'right': [2.5, 2.6, 2.5]},
+    )
+    print("Batch pass mask:", batch.passed)
+    for i in batch.failed_indices():
+        print(f"Variant {i}:", batch.violations(i))
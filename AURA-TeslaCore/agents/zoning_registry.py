@@ -0,0 +1,175 @@
+# agents/zoning_registry.py
+# Loads zone rule sets for many jurisdictions once and compiles them for O(1) lookup
+
+import json
+import os
+from functools import lru_cache
+from typing import Dict, List, Sequence
+import numpy as np
+
+from agents.zoning_agent import (
+    FAR_EXCEEDED, SETBACK_TOO_SMALL, HEIGHT_EXCEEDED, LAND_USE_NOT_PERMITTED,
+    ZoningAgent, ZoningResult,
+)
+
+
+class ZoningRuleRegistry:
+    def __init__(self, rule_sets: Dict[str, Dict]):
+        """
+        Compiles {zone_id: zoning_rules} (the dicts ZoningAgent takes) into
+        column arrays indexed by zone row:
+          - far / height_limit: float arrays
+          - setbacks: zones x edges array (0 where an edge has no requirement)
+          - allowed: zones x uses boolean matrix, plus one frozenset per zone
+        """
+        self.zone_ids: List[str] = list(rule_sets)
+        self.zone_index: Dict[str, int] = {zone: i for i, zone in enumerate(self.zone_ids)}
+
+        self.setback_edges: List[str] = sorted({e for r in rule_sets.values() for e in r.get('setbacks', {})})
+        edge_col = {edge: j for j, edge in enumerate(self.setback_edges)}
+        self.uses: List[str] = sorted({u for r in rule_sets.values() for u in r.get('allowed_uses', [])})
+        self.use_index: Dict[str, int] = {use: i for i, use in enumerate(self.uses)}
+
+        n = len(self.zone_ids)
+        self.far = np.empty(n)
+        self.height_limit = np.empty(n)
+        self.setbacks = np.zeros((n, len(self.setback_edges)))
+        self.allowed = np.zeros((n, len(self.uses)), dtype=bool)
+        self._rules: List[Dict] = []
+
+        for i, zone in enumerate(self.zone_ids):
+            raw = rule_sets[zone]
+            self.far[i] = raw['far']
+            self.height_limit[i] = raw['height_limit']
+            for edge, dist in raw.get('setbacks', {}).items():
+                self.setbacks[i, edge_col[edge]] = dist
+            allowed_uses = frozenset(raw.get('allowed_uses', []))
+            self.allowed[i, [self.use_index[u] for u in allowed_uses]] = True
+            self._rules.append({
+                'far': float(raw['far']),
+                'height_limit': float(raw['height_limit']),
+                'setbacks': dict(raw.get('setbacks', {})),
+                'allowed_uses': allowed_uses,
+            })
+
+    @classmethod
+    def from_directory(cls, rules_dir: str) -> "ZoningRuleRegistry":
+        """
+        Load every .json / .yaml rule file in rules_dir. Each file looks like
+        {"jurisdiction": "lagos", "zones": {"R1": {...zoning_rules...}, ...}}
+        and its zones are registered as "<jurisdiction>/<zone>"; the file name
+        stands in for a missing jurisdiction.
+        """
+        rule_sets = {}
+        for file in sorted(os.listdir(rules_dir)):
+            path = os.path.join(rules_dir, file)
+            stem, ext = os.path.splitext(file)
+            if ext == ".json":
+                with open(path, 'r') as f:
+                    data = json.load(f)
+            elif ext in (".yaml", ".yml"):
+                import yaml
+                with open(path, 'r') as f:
+                    data = yaml.safe_load(f)
+            else:
+                continue
+            jurisdiction = data.get('jurisdiction', stem)
+            for zone, rules in data.get('zones', {}).items():
+                rule_sets[f"{jurisdiction}/{zone}"] = rules
+        return cls(rule_sets)
+
+    def __contains__(self, zone_id: str) -> bool:
+        return zone_id in self.zone_index
+
+    def __len__(self) -> int:
+        return len(self.zone_ids)
+
+    def rules_for(self, zone_id: str) -> Dict:
+        """
+        Compiled rule dict for a zone (allowed_uses is a frozenset). Shared; do not mutate.
+        """
+        return self._rules[self.zone_index[zone_id]]
+
+    def agent_for(self, zone_id: str, site_data: Dict) -> ZoningAgent:
+        """
+        ZoningAgent for a parcel in zone_id, built on the precompiled rules.
+        """
+        return ZoningAgent(site_data, self.rules_for(zone_id))
+
+    def evaluate(self, zone_id: str, site_data: Dict, plan_summary: Dict) -> ZoningResult:
+        """
+        Validate one plan against a parcel's zone without re-parsing any rules.
+        """
+        return self.agent_for(zone_id, site_data).evaluate(plan_summary)
+
+    def validate_batch(self, zone_ids: Sequence[str], site_areas: Sequence[float],
+                       built_up_area: Sequence[float], height: Sequence[float],
+                       program: Sequence[str], setbacks: Dict[str, Sequence[float]]) -> np.ndarray:
+        """
+        Validate plans on parcels across many zones at once. Rules are gathered
+        from the compiled arrays by zone row; returns the OR-ed violation codes
+        per plan (0 = pass), using the flags from agents.zoning_agent.
+        """
+        rows = np.fromiter((self.zone_index[z] for z in zone_ids), dtype=np.int64, count=len(zone_ids))
+        far = np.asarray(built_up_area, dtype=float) / np.asarray(site_areas, dtype=float)
+        height = np.asarray(height, dtype=float)
+
+        use_ids = np.fromiter((self.use_index.get(p, -1) for p in program), dtype=np.int64, count=len(rows))
+        land_use_ok = use_ids >= 0
+        if self.uses:
+            land_use_ok &= self.allowed[rows, np.maximum(use_ids, 0)]
+
+        setbacks_ok = np.ones(len(rows), dtype=bool)
+        for j, edge in enumerate(self.setback_edges):
+            given = np.asarray(setbacks[edge], dtype=float) if edge in setbacks else np.zeros(len(rows))
+            setbacks_ok &= given >= self.setbacks[rows, j]
+
+        return (
+            np.where(far <= self.far[rows], 0, FAR_EXCEEDED)
+            | np.where(setbacks_ok, 0, SETBACK_TOO_SMALL)
+            | np.where(height <= self.height_limit[rows], 0, HEIGHT_EXCEEDED)
+            | np.where(land_use_ok, 0, LAND_USE_NOT_PERMITTED)
+        ).astype(np.uint8)
+
+
+@lru_cache(maxsize=None)
+def load_registry(rules_dir: str) -> ZoningRuleRegistry:
+    """
+    Process-wide registry per rules directory; files are read and compiled once.
+    """
+    return ZoningRuleRegistry.from_directory(rules_dir)
+
+
+# Example usage (run from AURA-TeslaCore: python -m agents.zoning_registry)
+if __name__ == "__main__":
+    registry = ZoningRuleRegistry({
+        'lagos/R1': {
+            'far': 1.5, 'height_limit': 10.0,
+            'setbacks': {'front': 5.0, 'rear': 3.0, 'left': 2.5, 'right': 2.5},
+            'allowed_uses': ['residential', 'office'],
+        },
+        'lagos/C2': {
+            'far': 3.0, 'height_limit': 24.0,
+            'setbacks': {'front': 3.0, 'rear': 2.0},
+            'allowed_uses': ['office', 'retail'],
+        },
+    })
+
+    plan = {
+        'built_up_area': 620.0,
+        'footprint': {'front': 4.2, 'rear': 3.0, 'left': 2.5, 'right': 2.1},
+        'height': 11.0,
+        'program': 'residential'
+    }
+    print("R1:", registry.evaluate('lagos/R1', {'area': 500.0}, plan))
+    print("C2:", registry.evaluate('lagos/C2', {'area': 500.0}, plan))
+
+    codes = registry.validate_batch(
+        zone_ids=['lagos/R1', 'lagos/C2', 'lagos/C2'],
+        site_areas=[500.0, 500.0, 300.0],
+        built_up_area=[620.0, 1200.0, 1200.0],
+        height=[9.0, 20.0, 20.0],
+        program=['residential', 'retail', 'warehouse'],
+        setbacks={'front': [5.0, 3.0, 3.0], 'rear': [3.0, 2.0, 2.0], 'left': [2.5, 0.0, 0.0], 'right': [2.5, 0.0, 0.0]},
+    )
+    print("Batch codes:", codes)
@@ -0,0 +1,7 @@
+# conftest.py
+# Lets pytest import the agents package (from agents.x import ...) from any working directory.
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))